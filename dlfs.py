@@ -1,55 +1,1080 @@
+import atexit
+import bisect
+import csv
+import heapq
 import json
 import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
 import uuid
-import random
+from array import array
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows, file locks use msvcrt instead
+    import msvcrt
 
 # === Data Directory ===
 DATA_DIR = "data"
-# Create the 'data' directory if it does not exist
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
-
-# Ensure required JSON files exist (users.json, items.json, claims.json)
-# If users.json does not exist, create it with a default admin account
-for file in ["users.json", "items.json", "claims.json"]:
-    path = os.path.join(DATA_DIR, file)
-    if not os.path.exists(path):
-        with open(path, "w") as f:
-            if file == "users.json":
-                # Add a default admin account
-                json.dump([{
-                    "id": 1,
-                    "name": "Admin",
-                    "email": "admin@dlfs.com",
-                    "password": "admin123",
-                    "role": "admin"
-                }], f, indent=4)
-            else:
-                # Initialize empty list for items.json and claims.json
-                json.dump([], f, indent=4)
+
+# Account created when a new data store has no users yet
+DEFAULT_ADMIN = {
+    "id": 1,
+    "name": "Admin",
+    "email": "admin@dlfs.com",
+    "password": "admin123",
+    "role": "admin"
+}
+
+# The app appends changes to a journal instead of rewriting the data files on
+# every change; the journal is folded into the files every SNAPSHOT_INTERVAL
+# entries. Turn off with the --no-journal flag.
+JOURNALED = True
+
+# Path of a SQLite database to use instead of the JSON files in DATA_DIR, see
+# migrate_json_to_sqlite. Set with the --sqlite flag.
+SQLITE_PATH = None
+
+
+def init_data_dir(data_dir=None):
+    """Create the data directory and its JSON files on first use"""
+    data_dir = data_dir or DATA_DIR
+    # Create the 'data' directory if it does not exist
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+
+    # Ensure required JSON files exist (users.json, items.json, claims.json)
+    # If users.json does not exist, create it with a default admin account
+    for file in ["users.json", "items.json", "claims.json"]:
+        path = os.path.join(data_dir, file)
+        if not os.path.exists(path):
+            with open(path, "w") as f:
+                if file == "users.json":
+                    # Add a default admin account
+                    json.dump([DEFAULT_ADMIN], f, indent=4)
+                else:
+                    # Initialize empty list for items.json and claims.json
+                    json.dump([], f, indent=4)
 
 
 # === Helper Functions for JSON Data ===
-def load_data(file_name):
-    """Load JSON data from a file and return as Python list"""
-    path = os.path.join(DATA_DIR, file_name)
+# Supported file formats: "json" (indented array) and "jsonl" (one record per line)
+DATA_FORMATS = ("json", "jsonl")
+
+
+def detect_format(path):
+    """Return "jsonl" if the file holds one record per line, otherwise "json" """
+    with open(path, "r") as file:
+        blank = False
+        while True:
+            char = file.read(1)
+            if not char:
+                # An empty JSON Lines file is written as a single newline
+                return "jsonl" if blank else "json"
+            if not char.isspace():
+                return "jsonl" if char == "{" else "json"
+            blank = True
+
+
+# When written files are fsynced: "always" (every write), "batched" (snapshot
+# writes, and appends at most once per FSYNC_INTERVAL seconds, so an append is
+# durable within that time) or "never"
+FSYNC_POLICY = "batched"
+FSYNC_INTERVAL = 1.0
+# Suffix of the last good snapshot kept next to each data file
+BACKUP_SUFFIX = ".bak"
+
+_last_append_sync = 0.0
+_unsynced = set()  # Paths of appended files whose fsync was deferred
+_sync_timer = None
+_sync_lock = threading.Lock()
+
+
+def sync_file(file, append=False):
+    """fsync a file that was just written, according to FSYNC_POLICY"""
+    global _last_append_sync, _sync_timer
+    if FSYNC_POLICY == "never":
+        return
+    file.flush()
+    if append and FSYNC_POLICY == "batched":
+        path = os.path.abspath(file.name)
+        with _sync_lock:
+            now = time.monotonic()
+            wait = _last_append_sync + FSYNC_INTERVAL - now
+            if wait > 0:
+                # Synced by sync_pending once the interval is over
+                _unsynced.add(path)
+                if _sync_timer is None:
+                    _sync_timer = threading.Timer(wait, sync_pending)
+                    _sync_timer.daemon = True
+                    _sync_timer.start()
+                return
+            _last_append_sync = now
+            _unsynced.discard(path)
+    os.fsync(file.fileno())
+
+
+def sync_pending():
+    """fsync the appended files whose batched fsync was deferred"""
+    global _last_append_sync, _sync_timer
+    with _sync_lock:
+        paths = list(_unsynced)
+        _unsynced.clear()
+        _sync_timer = None
+        _last_append_sync = time.monotonic()
+    for path in paths:
+        sync_path(path)
+
+
+def sync_path(path):
+    """fsync a file by path, e.g. after appends whose fsync was left for later"""
+    try:
+        fd = os.open(path, os.O_WRONLY)
+    except FileNotFoundError:
+        return  # Replaced meanwhile, and the new file was synced when written
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Deferred fsyncs must not be lost when the interpreter exits before the timer fires
+atexit.register(sync_pending)
+
+
+def sync_dir(path):
+    """fsync a directory so that a rename inside it is durable (POSIX only)"""
+    if FSYNC_POLICY == "never" or os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, write):
+    """Write a file through write(file) so that a crash never leaves it half written.
+
+    The data goes to a temporary file that is fsynced and renamed over path.
+    The previous version is kept as path + BACKUP_SUFFIX through a hard link,
+    so no data is copied.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as file:
+        write(file)
+        sync_file(file)
+    if os.path.exists(path):
+        backup = path + BACKUP_SUFFIX
+        if os.path.exists(backup):
+            os.remove(backup)
+        try:
+            os.link(path, backup)
+        except OSError:
+            os.replace(path, backup)  # No hard links on this filesystem
+    os.replace(temp_path, path)
+    sync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+def repair_jsonl_tail(path):
+    """Fix a JSON Lines file whose last line was cut off by a crash during an append"""
+    with open(path, "rb+") as file:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        if size == 0:
+            return
+        file.seek(size - 1)
+        if file.read(1) == b"\n":
+            return
+        # Find the start of the unterminated last line
+        start = max(size - STREAM_CHUNK_SIZE, 0)
+        while True:
+            file.seek(start)
+            newline = file.read(size - start).rfind(b"\n")
+            if newline >= 0 or start == 0:
+                start += newline + 1
+                break
+            start = max(start - STREAM_CHUNK_SIZE, 0)
+        file.seek(start)
+        try:
+            json.loads(file.read())
+            file.write(b"\n")  # The record is complete, only the newline is missing
+        except ValueError:
+            file.truncate(start)
+
+
+def read_file(path):
+    """Parse a JSON or JSON Lines data file into a list"""
+    if os.path.getsize(path) == 0:
+        return []
+    if detect_format(path) == "jsonl":
+        repair_jsonl_tail(path)
+        with open(path, "r") as file:
+            return [json.loads(line) for line in file if line.strip()]
     with open(path, "r") as file:
+        return json.load(file)
+
+
+def recover_data(file_name, data_dir=None):
+    """Restore a damaged data file from its last good snapshot, return True on success"""
+    path = os.path.join(data_dir or DATA_DIR, file_name)
+    backup = path + BACKUP_SUFFIX
+    if not os.path.exists(backup) or os.path.getsize(backup) == 0:
+        return False
+    try:
+        if not read_file(backup):
+            return False  # Nothing in the snapshot worth restoring
+    except json.JSONDecodeError:
+        return False
+    # Restore a copy so that later appends to the file cannot touch the snapshot
+    temp_path = path + ".tmp"
+    shutil.copyfile(backup, temp_path)
+    os.replace(temp_path, path)
+    print(f"Warning: {path} was damaged and has been restored from {backup}", file=sys.stderr)
+    return True
+
+
+def load_data(file_name, data_dir=None):
+    """Load JSON data from a file and return as Python list.
+
+    A damaged file is restored from its last good snapshot. If there is no
+    usable snapshot json.JSONDecodeError is raised, rather than losing data.
+    """
+    path = os.path.join(data_dir or DATA_DIR, file_name)
+    if os.path.getsize(path) == 0:
+        recover_data(file_name, data_dir)  # Truncated by a crash during a plain write
+    try:
+        return read_file(path)
+    except json.JSONDecodeError:
+        if not recover_data(file_name, data_dir):
+            raise
+        return read_file(path)
+
+
+# Files larger than this many bytes are parsed incrementally by iter_data
+STREAM_THRESHOLD = 1024 * 1024
+# Number of characters read from disk at a time while streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def iter_data(file_name, data_dir=None):
+    """Yield the records of a JSON or JSONL file one at a time.
+
+    Small JSON files are loaded with load_data. Larger files are decoded record
+    by record, so the whole document is never held in memory. Raises
+    json.JSONDecodeError if the file is malformed or truncated.
+    """
+    path = os.path.join(data_dir or DATA_DIR, file_name)
+    if detect_format(path) == "jsonl":
+        repair_jsonl_tail(path)
+        with open(path, "r") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    if os.path.getsize(path) <= STREAM_THRESHOLD:
+        yield from load_data(file_name, data_dir)
+        return
+    decoder = json.JSONDecoder()
+    with open(path, "r") as file:
+        buffer = ""
+        pos = 0
+        started = False
+        eof = False
+        while True:
+            # Skip whitespace and separators between records
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    if started:
+                        raise json.JSONDecodeError("Unterminated array", buffer, pos)
+                    return  # Empty file
+                buffer, pos = file.read(STREAM_CHUNK_SIZE), 0
+                eof = not buffer
+                continue
+            if not started:
+                if buffer[pos] != "[":
+                    raise json.JSONDecodeError("Expecting '['", buffer, pos)
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as exc:
+                # A record cut off by the chunk fails at the end of the buffer (or
+                # inside an open string) and continues in the next chunk; anything
+                # else is damage that more data will not fix
+                cut = exc.pos >= len(buffer) - 8 or exc.msg.startswith("Unterminated string")
+                chunk = file.read(STREAM_CHUNK_SIZE) if cut else ""
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield record
+            pos = end
+
+
+def save_data(file_name, data, data_dir=None, fmt="json"):
+    """Save Python list as JSON (or JSON Lines) to a file, atomically"""
+    path = os.path.join(data_dir or DATA_DIR, file_name)
+
+    def write(file):
+        if fmt == "jsonl":
+            for record in data:
+                file.write(json.dumps(record, default=to_json) + "\n")
+            if not data:
+                file.write("\n")  # Lets detect_format tell an empty file's format
+        else:
+            json.dump(data, file, indent=4, default=to_json)
+
+    write_atomic(path, write)
+
+
+def append_data(file_name, records, data_dir=None):
+    """Append records to a JSON Lines file"""
+    path = os.path.join(data_dir or DATA_DIR, file_name)
+    with open(path, "a") as file:
+        for record in records:
+            file.write(json.dumps(record, default=to_json) + "\n")
+        sync_file(file, append=True)
+
+
+def split_jsonl(file_name, parts, data_dir=None):
+    """Split a JSON Lines file into about equal (start, end) byte ranges on line boundaries"""
+    path = os.path.join(data_dir or DATA_DIR, file_name)
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as file:
+        for i in range(1, parts):
+            file.seek(max(size * i // parts, bounds[-1]))
+            file.readline()  # Move to the start of the next line
+            bounds.append(min(file.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def iter_jsonl_range(file_name, start, end, data_dir=None):
+    """Yield the records of a JSON Lines file between two byte offsets from split_jsonl"""
+    path = os.path.join(data_dir or DATA_DIR, file_name)
+    with open(path, "rb") as file:
+        file.seek(start)
+        while file.tell() < end:
+            line = file.readline()
+            if not line:
+                break
+            if line.strip():
+                yield json.loads(line)
+
+
+def convert_data_dir(fmt, data_dir=None):
+    """Rewrite the items and claims files of a data directory in the given format"""
+    if fmt not in DATA_FORMATS:
+        raise ValueError(f"Unknown data format: {fmt}")
+    # Hold the directory lock so no other process writes a file while it is rewritten
+    with JsonStorage(data_dir).lock():
+        for file_name in ["items.json", "claims.json"]:
+            save_data(file_name, list(iter_data(file_name, data_dir)), data_dir, fmt)
+
+
+# === Multi-process Access ===
+# File in the data directory that writers lock while they update it
+LOCK_FILE = ".lock"
+
+
+def lock_file(file):
+    """Block until this process holds an exclusive lock on an open file"""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        return
+    file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            pass  # LK_LOCK gives up after 10 seconds, keep waiting
+
+
+def unlock_file(file):
+    """Release a lock taken with lock_file"""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def file_stamp(path):
+    """Return a version stamp that changes whenever a file is replaced or appended to"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+# === Journal ===
+# Append-only log of mutations, replayed on top of the JSON snapshots at startup
+JOURNAL_FILE = "journal.log"
+# Number of journal entries after which the journal is compacted into snapshots
+SNAPSHOT_INTERVAL = 1000
+
+# Field that uniquely identifies a record in each collection file
+COLLECTION_KEYS = {
+    "users.json": "id",
+    "items.json": "item_id",
+    "claims.json": "claim_id",
+}
+
+# Controller attribute holding each collection file
+COLLECTION_ATTRS = {
+    "users.json": "users",
+    "items.json": "items",
+    "claims.json": "claims",
+}
+
+
+def append_journal(entries, data_dir=None, sync=True):
+    """Append journal entries to the journal file, one JSON object per line.
+
+    With sync=False the entries are only handed to the OS; call sync_journal
+    to make them durable.
+    """
+    path = os.path.join(data_dir or DATA_DIR, JOURNAL_FILE)
+    with open(path, "a") as file:
+        for entry in entries:
+            file.write(json.dumps(entry, default=to_json) + "\n")
+        if sync:
+            sync_file(file, append=True)
+
+
+def sync_journal(data_dir=None):
+    """fsync the journal file after appends made with sync=False"""
+    if FSYNC_POLICY != "never":
+        sync_path(os.path.join(data_dir or DATA_DIR, JOURNAL_FILE))
+
+
+def read_journal(data_dir=None, offset=0):
+    """Return the complete journal entries after a byte offset, and the offset where they end"""
+    path = os.path.join(data_dir or DATA_DIR, JOURNAL_FILE)
+    if not os.path.exists(path):
+        return [], 0
+    # Drop a torn last entry so that later appends start on a fresh line
+    repair_jsonl_tail(path)
+    entries = []
+    with open(path, "rb") as file:
+        file.seek(offset)
+        for line in file:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # Torn write at the end of the journal, ignore the rest
+            offset += len(line)
+    return entries, offset
+
+
+def clear_journal(data_dir=None):
+    """Empty the journal file after its entries have been compacted.
+
+    The file is replaced rather than truncated, so other processes can tell
+    from its stamp that it was compacted.
+    """
+    path = os.path.join(data_dir or DATA_DIR, JOURNAL_FILE)
+    write_atomic(path, lambda file: None)
+
+
+# === Storage Backends ===
+class JsonStorage:
+    """Stores each collection as a JSON or JSON Lines file in a data directory.
+
+    With fmt=None each file keeps the format it already has on disk.
+    """
+    def __init__(self, data_dir=None, fmt=None):
+        self.data_dir = data_dir or DATA_DIR
+        # Directory of the journal used by journaled controllers
+        self.journal_dir = self.data_dir
+        self.fmt = fmt
+        self._formats = {}  # file name -> format detected on load
+        self._counts = {}  # file name -> number of records on disk
+        self._stamps = {}  # file name -> file stamp of the version in memory
+        self._thread_lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth = 0
+        init_data_dir(self.data_dir)
+
+    @contextmanager
+    def lock(self):
+        """Hold an exclusive lock on the data directory, shared with other processes"""
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self._lock_file = open(os.path.join(self.data_dir, LOCK_FILE), "a+")
+                lock_file(self._lock_file)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    unlock_file(self._lock_file)
+                    self._lock_file.close()
+
+    def is_stale(self, file_name):
+        """Return True if the file changed on disk since it was loaded or written here"""
+        return file_stamp(os.path.join(self.data_dir, file_name)) != self._stamps.get(file_name)
+
+    def load_appended(self, file_name, record_type=None):
+        """Return the records appended to a JSON Lines file since it was last read or written.
+
+        Returns None if the file was replaced or is not JSON Lines, in which
+        case it has to be loaded again in full.
+        """
+        path = os.path.join(self.data_dir, file_name)
+        old, new = self._stamps.get(file_name), file_stamp(path)
+        if old is None or new is None or new[0] != old[0] or new[1] < old[1]:
+            return None
+        if self._formats.get(file_name) != "jsonl":
+            return None
+        repair_jsonl_tail(path)
+        new = file_stamp(path)
+        records = iter_jsonl_range(file_name, old[1], new[1], self.data_dir)
+        if record_type is not None:
+            records = (record_type.from_dict(record) for record in records)
+        records = list(records)
+        self._stamps[file_name] = new
+        self._counts[file_name] = self._counts.get(file_name, 0) + len(records)
+        return records
+
+    def _format(self, file_name):
+        return self.fmt or self._formats.get(file_name, "json")
+
+    def load(self, file_name, record_type=None):
+        """Return all records of a collection, converted with record_type.from_dict if given"""
+        path = os.path.join(self.data_dir, file_name)
+        if os.path.getsize(path) == 0:
+            recover_data(file_name, self.data_dir)  # Truncated by a crash during a plain write
+        # Stamp before reading: a change made meanwhile shows up as stale later
+        self._stamps[file_name] = file_stamp(path)
         try:
-            return json.load(file)
+            records = self._read(file_name, record_type)
         except json.JSONDecodeError:
-            return []  # Return empty list if file is empty or corrupted
+            # Restore the last good snapshot instead of starting from an empty list
+            if not recover_data(file_name, self.data_dir):
+                raise
+            records = self._read(file_name, record_type)
+            self._stamps[file_name] = file_stamp(path)
+        self._formats[file_name] = detect_format(path)
+        self._counts[file_name] = len(records)
+        return records
+
+    def _read(self, file_name, record_type):
+        records = iter_data(file_name, self.data_dir)
+        if record_type is not None:
+            records = (record_type.from_dict(record) for record in records)
+        return list(records)
+
+    def save(self, file_name, records):
+        """Replace a collection with the given records"""
+        fmt = self._format(file_name)
+        save_data(file_name, records, self.data_dir, fmt)
+        self._formats[file_name] = fmt
+        self._counts[file_name] = len(records)
+        self._stamps[file_name] = file_stamp(os.path.join(self.data_dir, file_name))
+
+    def apply(self, file_name, changed, records):
+        """Persist changed records.
+
+        New records at the end of a JSON Lines file are appended; anything
+        else rewrites the file.
+        """
+        new = len(records) - self._counts.get(file_name, -1)
+        if (self._format(file_name) == "jsonl" and self._formats.get(file_name) == "jsonl"
+                and new == len(changed) and all(a is b for a, b in zip(records[-new:], changed))):
+            append_data(file_name, changed, self.data_dir)
+            self._counts[file_name] = len(records)
+            self._stamps[file_name] = file_stamp(os.path.join(self.data_dir, file_name))
+        else:
+            self.save(file_name, records)
+
+
+# Table name, key column and columns of each collection in SQLite
+SQLITE_TABLES = {
+    "users.json": ("users", "id", ["id", "name", "email", "password", "role"]),
+    "items.json": ("items", "item_id", ["item_id", "name", "description", "location", "item_type", "status"]),
+    "claims.json": ("claims", "claim_id", ["claim_id", "user_id", "item_id", "status"]),
+}
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY, name TEXT, email TEXT, password TEXT, role TEXT);
+CREATE TABLE IF NOT EXISTS items (
+    item_id TEXT PRIMARY KEY, name TEXT, description TEXT, location TEXT, item_type TEXT, status TEXT);
+CREATE TABLE IF NOT EXISTS claims (
+    claim_id TEXT PRIMARY KEY, user_id INTEGER, item_id TEXT, status TEXT);
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT PRIMARY KEY, version INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS users_email ON users (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS items_type ON items (item_type);
+CREATE INDEX IF NOT EXISTS items_status ON items (status);
+CREATE INDEX IF NOT EXISTS items_location ON items (location COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS claims_status ON claims (status);
+CREATE INDEX IF NOT EXISTS claims_item ON claims (item_id);
+"""
+
+
+class SQLiteStorage:
+    """Stores collections as tables in a SQLite database with per-row updates"""
+    def __init__(self, db_path):
+        self.db_path = db_path
+        # Rows are updated in place, so there is no journal. Sharing one with
+        # a JSON data directory next to the database would mix the two stores.
+        self.journal_dir = None
+        self._lock = threading.Lock()
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        # file name -> version of its table when it was loaded. Every write bumps
+        # the table's row in the versions table, so only changed tables reload.
+        self._versions = {}
+        # Transactions are started explicitly, see lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        synchronous = {"always": "FULL", "batched": "NORMAL", "never": "OFF"}[FSYNC_POLICY]
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(SQLITE_SCHEMA)
+        with self.lock():
+            if self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+                self.apply("users.json", [DEFAULT_ADMIN], None)
+
+    def load(self, file_name, record_type=None):
+        """Return all records of a collection in insertion order"""
+        table, key, columns = SQLITE_TABLES[file_name]
+        with self._lock:
+            # Version before reading: a change made meanwhile shows up as stale later
+            self._versions[file_name] = self._table_version(table)
+            rows = self._conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid").fetchall()
+        records = (dict(zip(columns, row)) for row in rows)
+        if record_type is not None:
+            records = (record_type.from_dict(record) for record in records)
+        return list(records)
+
+    def save(self, file_name, records):
+        """Replace a collection with the given records"""
+        table, key, columns = SQLITE_TABLES[file_name]
+        with self.lock(), self._lock:
+            self._conn.execute(f"DELETE FROM {table}")
+            self._insert(table, key, columns, records)
+            self._bump_version(file_name, True)
+
+    def apply(self, file_name, changed, records):
+        """Insert or update only the changed rows"""
+        table, key, columns = SQLITE_TABLES[file_name]
+        with self.lock(), self._lock:
+            self._insert(table, key, columns, changed)
+            self._bump_version(file_name, False)
+
+    def _insert(self, table, key, columns, records):
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != key)
+        self._conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT ({key}) DO UPDATE SET {updates}",
+            [[record.get(column) for column in columns] for record in records])
+
+    def _table_version(self, table):
+        row = self._conn.execute("SELECT version FROM versions WHERE name = ?", (table,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump_version(self, file_name, replaced):
+        """Count a write to a table (hold self._lock inside lock())"""
+        table = SQLITE_TABLES[file_name][0]
+        old = self._table_version(table)
+        self._conn.execute(
+            "INSERT INTO versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = version + 1", (table,))
+        # Memory matches the table only if nobody else wrote it since it was loaded
+        if replaced or self._versions.get(file_name) == old:
+            self._versions[file_name] = old + 1
+
+    @contextmanager
+    def lock(self):
+        """Hold the database write lock, shared with other processes.
+
+        The outermost lock() runs a BEGIN IMMEDIATE transaction that commits
+        when it exits, or rolls back on an exception, so a check-then-write
+        such as add_user is atomic across processes.
+        """
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                with self._lock:
+                    self._conn.execute("BEGIN IMMEDIATE")
+            self._lock_depth += 1
+            try:
+                yield
+            except BaseException:
+                if self._lock_depth == 1:
+                    with self._lock:
+                        self._conn.rollback()
+                raise
+            else:
+                if self._lock_depth == 1:
+                    with self._lock:
+                        self._conn.commit()
+            finally:
+                self._lock_depth -= 1
+
+    def is_stale(self, file_name):
+        """Return True if the table was written by another connection since it was loaded"""
+        with self._lock:
+            return self._table_version(SQLITE_TABLES[file_name][0]) != self._versions.get(file_name)
+
+    def load_appended(self, file_name, record_type=None):
+        """Rows may be updated in place, so changed tables are always loaded in full"""
+        return None
+
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+
+
+def normalize_email(email):
+    """Normalise an email address for lookups (case and surrounding spaces ignored)"""
+    return email.strip().lower()
+
+
+def normalize_location(location):
+    """Normalise a location for lookups (case and extra spaces ignored)"""
+    return " ".join(location.lower().split())
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return re.findall(r"\w+", text.lower())
+
+
+def trigrams(text):
+    """Return the set of 3-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Maps every trigram of a lowercased text to the keys whose text contains it"""
+    def __init__(self):
+        self.postings = {}  # trigram -> set of keys
+
+    def add(self, key, text):
+        """Index the text stored under key"""
+        for gram in trigrams(text.lower()):
+            self.postings.setdefault(gram, set()).add(key)
+
+    def candidates(self, query):
+        """Return the keys that may contain query as a substring.
+
+        Returns None when the query is too short to be narrowed by trigrams.
+        """
+        grams = trigrams(query.lower())
+        if not grams:
+            return None
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches &= posting
+            if not matches:
+                break
+        return matches
 
 
-def save_data(file_name, data):
-    """Save Python list as JSON to a file"""
-    path = os.path.join(DATA_DIR, file_name)
-    with open(path, "w") as file:
-        json.dump(data, file, indent=4)
+# Largest number of typos tolerated by fuzzy search
+FUZZY_MAX_DISTANCE = 2
+# Only the start of a word is used to generate deletions, which bounds the index size
+FUZZY_PREFIX_LENGTH = 7
+
+
+def deletions(word, distance):
+    """Return word and every string obtained by deleting up to distance characters"""
+    variants = {word}
+    edge = {word}
+    for _ in range(distance):
+        edge = {variant[:i] + variant[i + 1:] for variant in edge for i in range(len(variant))}
+        variants |= edge
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """Return the edit distance between a and b counting swaps of adjacent
+    characters as one edit, or limit + 1 once it is known to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous, row = row, current
+    return min(row[-1], limit + 1)
+
+
+class DeletionIndex:
+    """Symmetric-deletion dictionary for typo-tolerant word lookups.
+
+    Every distinct word is stored under each string obtained by deleting up
+    to FUZZY_MAX_DISTANCE characters from it. A misspelt query shares one of
+    those deletions with the words it is close to, so a lookup only checks
+    the handful of words found under the query's own deletions.
+    """
+    def __init__(self):
+        self.words = {}  # word -> set of keys
+        self.deletes = {}  # deletion of a word prefix -> set of words
+
+    def add(self, key, word):
+        """Index word under key"""
+        keys = self.words.get(word)
+        if keys is None:
+            keys = self.words[word] = set()
+            for variant in deletions(word[:FUZZY_PREFIX_LENGTH], FUZZY_MAX_DISTANCE):
+                self.deletes.setdefault(variant, set()).add(word)
+        keys.add(key)
+
+    def lookup(self, word, max_distance):
+        """Return {indexed word: edit distance} for words within max_distance of word"""
+        max_distance = min(max_distance, FUZZY_MAX_DISTANCE)
+        matches = {}
+        seen = set()
+        for variant in deletions(word[:FUZZY_PREFIX_LENGTH], max_distance):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate not in seen:
+                    seen.add(candidate)
+                    distance = edit_distance(word, candidate, max_distance)
+                    if distance <= max_distance:
+                        matches[candidate] = distance
+        return matches
+
+
+# === Columnar Item Store ===
+# NumPy module once imported, False if it is not installed
+_numpy = None
+
+
+def get_numpy():
+    """Return the numpy module, or None if it is not installed.
+
+    NumPy is optional (ItemColumns filters are vectorised when it is
+    available) and only imported on first use, as it is slow to import.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+class CategoricalColumn:
+    """Column of repeated strings stored as integer codes into a table of distinct values"""
+    def __init__(self):
+        self.values = []  # code -> value
+        self.value_codes = {}  # value -> code
+        self.codes = array("i")
+
+    def _code(self, value):
+        code = self.value_codes.get(value)
+        if code is None:
+            code = self.value_codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(self._code(value))
+
+    def set(self, pos, value):
+        self.codes[pos] = self._code(value)
+
+
+class ItemColumns:
+    """Columnar copy of the item fields used for bulk filters and counts.
+
+    Rows are in the same order as controller.items. item_type, status and
+    (normalised) location are stored as categorical codes, and filters run as
+    NumPy vector operations when NumPy is installed.
+    """
+    FIELDS = ("item_type", "status", "location")
+
+    def __init__(self, items=()):
+        self.columns = {field: CategoricalColumn() for field in self.FIELDS}
+        for item in items:
+            self.append(item)
+
+    def __len__(self):
+        return len(self.columns["status"].codes)
+
+    @staticmethod
+    def _value(field, value):
+        return normalize_location(value) if field == "location" else value
+
+    def append(self, item):
+        """Add a row for a new item"""
+        for field, column in self.columns.items():
+            column.append(self._value(field, item[field]))
+
+    def set(self, pos, field, value):
+        """Change one field of the row at pos"""
+        self.columns[field].set(pos, self._value(field, value))
+
+    def _wanted_codes(self, field, values):
+        """Return the codes matching a value or a list of values"""
+        if isinstance(values, str):
+            values = [values]
+        value_codes = self.columns[field].value_codes
+        values = [self._value(field, value) for value in values]
+        return [value_codes[value] for value in values if value in value_codes]
+
+    def filter(self, **criteria):
+        """Return the row positions matching all criteria, e.g. filter(item_type="lost", status=["reported"])"""
+        wanted = {field: self._wanted_codes(field, values) for field, values in criteria.items()}
+        numpy = get_numpy()
+        if numpy is not None:
+            mask = numpy.ones(len(self), dtype=bool)
+            for field, codes in wanted.items():
+                # Copy the codes: a view would make appends to the array fail while it exists
+                column = numpy.array(self.columns[field].codes, dtype=numpy.int32)
+                mask &= numpy.isin(column, codes)
+            return numpy.flatnonzero(mask).tolist()
+        positions = range(len(self))
+        for field, codes in wanted.items():
+            column = self.columns[field].codes
+            codes = set(codes)
+            positions = [pos for pos in positions if column[pos] in codes]
+        return list(positions)
+
+    def count(self, **criteria):
+        """Return the number of rows matching all criteria"""
+        if not criteria:
+            return len(self)
+        return len(self.filter(**criteria))
+
+    def value_counts(self, field, **criteria):
+        """Return {value: number of rows} for a field over the rows matching criteria"""
+        column = self.columns[field]
+        if criteria:
+            codes = [column.codes[pos] for pos in self.filter(**criteria)]
+        else:
+            codes = column.codes
+        numpy = get_numpy()
+        if numpy is not None:
+            counts = numpy.bincount(numpy.array(codes, dtype=numpy.int32), minlength=len(column.values))
+        else:
+            counts = [0] * len(column.values)
+            for code in codes:
+                counts[code] += 1
+        return {value: int(n) for value, n in zip(column.values, counts) if n}
+
+
+# === ID Generation ===
+class IdAllocator:
+    """Hands out unique, time-ordered IDs without reading existing records.
+
+    An ID is the current time in milliseconds followed by a node tag that is
+    unique per process, so concurrent writers never produce the same ID and
+    IDs from one process always increase.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        # A forked child must not reuse its parent's node tag
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.node = f"{os.getpid() & 0xFFFF:04X}{uuid.uuid4().hex[:4].upper()}"
+        self.last = 0
+
+    def next_id(self, prefix):
+        """Return a new ID such as ITEM-0192A3B4C5D6E1234ABCD"""
+        with self._lock:
+            # Never go backwards, even if the system clock does
+            self.last = max(time.time_ns() // 1_000_000, self.last + 1)
+            return f"{prefix}-{self.last:011X}{self.node}"
+
+
+id_allocator = IdAllocator()
 
 
 # === Classes ===
-class User:
+class Record:
+    """Base class for compact records stored in __slots__ instead of a dict.
+
+    Records can still be read and updated like the dictionaries they replace
+    (record["name"]), and to_dict/from_dict convert them to and from the
+    on-disk format.
+    """
+    __slots__ = ()
+    # On-disk field name -> attribute name, in on-disk order
+    FIELDS = {}
+
+    def __getitem__(self, field):
+        return getattr(self, self.FIELDS[field])
+
+    def __setitem__(self, field, value):
+        setattr(self, self.FIELDS[field], value)
+
+    def __contains__(self, field):
+        return field in self.FIELDS
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()})"
+
+    def get(self, field, default=None):
+        """Return a field value, or default if the record has no such field"""
+        return self[field] if field in self.FIELDS else default
+
+    def keys(self):
+        """Return the on-disk field names"""
+        return self.FIELDS.keys()
+
+    def update(self, fields):
+        """Set several fields from a dictionary"""
+        for field, value in fields.items():
+            self[field] = value
+
+    def to_dict(self):
+        """Return the record as a dictionary in the on-disk format"""
+        return {field: getattr(self, attr) for field, attr in self.FIELDS.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a record from a dictionary in the on-disk format"""
+        record = cls.__new__(cls)
+        for field, attr in cls.FIELDS.items():
+            setattr(record, attr, data.get(field))
+        return record
+
+
+def to_json(obj):
+    """json.dump default hook that serialises records"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class User(Record):
     """Represents a user in the system"""
+    __slots__ = ("user_id", "name", "email", "password", "role")
+    FIELDS = {"id": "user_id", "name": "name", "email": "email", "password": "password", "role": "role"}
+
     def __init__(self, user_id, name, email, password, role="user"):
         self.user_id = user_id
         self.name = name
@@ -60,91 +1085,1258 @@ class User:
 
 class Admin(User):
     """Represents an admin user (inherits from User)"""
+    __slots__ = ()
+
     def __init__(self, user_id, name, email, password):
         super().__init__(user_id, name, email, password, role="admin")
 
 
-class ReportedItem:
+class ReportedItem(Record):
     """Represents an item that is reported as lost or found"""
+    __slots__ = ("item_id", "name", "description", "location", "item_type", "status")
+    FIELDS = {field: field for field in __slots__}
+
     def __init__(self, name, description, location, item_type):
-        # Generate short readable ID like ITEM-1234
-        self.item_id = f"ITEM-{random.randint(1000, 9999)}"
+        # Generate unique time-ordered ID like ITEM-0192A3B4C5D6E1234ABCD
+        self.item_id = id_allocator.next_id("ITEM")
         self.name = name
         self.description = description
         self.location = location
         self.item_type = item_type  # "lost" or "found"
         self.status = "reported"  # reported, claimed, approved, returned
 
-class Claim:
+
+class Claim(Record):
     """Represents a claim made by a user for a found item"""
+    __slots__ = ("claim_id", "user_id", "item_id", "status")
+    FIELDS = {field: field for field in __slots__}
+
     def __init__(self, user_id, item_id):
-        # Generate short readable ID like CLM-5678
-        self.claim_id = f"CLM-{random.randint(1000, 9999)}"
+        # Generate unique time-ordered ID like CLM-0192A3B4C5D6E1234ABCD
+        self.claim_id = id_allocator.next_id("CLM")
         self.user_id = user_id
         self.item_id = item_id
         self.status = "pending"  # pending, approved
 
+
+# Allowed values of ReportedItem.item_type
+ITEM_TYPES = ("lost", "found")
+
+
+def validate_item_row(row):
+    """Return an error message for an imported item row, or None if it is valid"""
+    if isinstance(row, ValueError):
+        return str(row)  # Stands in for a line that could not be parsed
+    if not isinstance(row, dict):
+        return "not a JSON object"
+    for field in ["name", "location", "item_type"]:
+        if not str(row.get(field) or "").strip():
+            return f"missing {field}"
+    if str(row["item_type"]).strip().lower() not in ITEM_TYPES:
+        return f"item_type must be one of {', '.join(ITEM_TYPES)}"
+    return None
+
+
+# Record class stored in each collection file
+COLLECTION_TYPES = {
+    "users.json": User,
+    "items.json": ReportedItem,
+    "claims.json": Claim,
+}
+
+# Prefix of the generated IDs in each collection file
+ID_PREFIXES = {
+    "items.json": "ITEM",
+    "claims.json": "CLM",
+}
+
+
 # === Controller ===
+# Default number of items per page returned by list_items
+PAGE_SIZE = 20
+
+
 class DLFSController:
     """Main controller to manage users, items, and claims"""
-    def __init__(self):
-        # Load data from JSON files into memory
-        self.users = load_data("users.json")
-        self.items = load_data("items.json")
-        self.claims = load_data("claims.json")
+    def __init__(self, journaled=False, storage=None):
+        # In journaled mode mutations are appended to the journal instead of
+        # rewriting every JSON file
+        self.journaled = journaled
+        # Backend that holds the data, JSON files in DATA_DIR by default
+        self.storage = storage or JsonStorage()
+        if journaled and self.storage.journal_dir is None:
+            raise ValueError(f"{type(self.storage).__name__} does not support journaled mode")
+        # Flush after every mutation; turned off when something else schedules flushes
+        self.autoflush = True
+        # GroupCommitWriter that flushes in the background, see start_group_commit
+        self._writer = None
+        # Guards the in-memory state. When both are needed, take storage.lock() first
+        self._lock = threading.RLock()
+        self._journal_size = 0  # Entries in the journal
+        self._journal_files = set()  # Collection files with entries in the journal
+        self._journal_offset = 0  # Bytes of the journal applied in memory
+        self._journal_stamp = None
+        # Changed records waiting to be persisted: file name -> {record key: record}
+        self._pending = {}
+        # Bumped by every change, so work done without the lock can tell it is out of date
+        self._version = 0
+        self._batch_depth = 0
+        with self.storage.lock():
+            # Load data from storage into memory
+            # Records are held as compact User/ReportedItem/Claim objects
+            self.users = self._load("users.json")
+            self.items = self._load("items.json")
+            self.claims = self._load("claims.json")
+            self._replay_journal()
+            # Without journaling, fold any leftover entries into the snapshots right away
+            if self._journal_size and not self._journal_in_use():
+                self.compact()
+        self._build_indexes()
+
+    def _collection(self, file_name):
+        """Return the in-memory list stored in the given file"""
+        return getattr(self, COLLECTION_ATTRS[file_name])
+
+    def _load(self, file_name):
+        """Load a collection from storage, giving records with a duplicate ID a new one.
+
+        Random 4-digit IDs from older versions can collide, and the indexes
+        need unique IDs. The first record keeps the ID (and the claims that
+        refer to it); the fixed collection is written back once.
+        """
+        records = self.storage.load(file_name, COLLECTION_TYPES[file_name])
+        prefix = ID_PREFIXES.get(file_name)
+        if prefix is None:
+            return records
+        key = COLLECTION_KEYS[file_name]
+        seen = set()
+        renamed = 0
+        for record in records:
+            if record[key] in seen:
+                record[key] = id_allocator.next_id(prefix)
+                renamed += 1
+            seen.add(record[key])
+        if renamed:
+            self.storage.save(file_name, records)
+            print(f"Warning: {renamed} records in {file_name} had duplicate IDs and were given new ones",
+                  file=sys.stderr)
+        return records
+
+    def _journal_file_stamp(self):
+        """Return the stamp of the journal file, or None if there is none"""
+        if self.storage.journal_dir is None:
+            return None
+        return file_stamp(os.path.join(self.storage.journal_dir, JOURNAL_FILE))
+
+    def _upsert(self, file_name, records):
+        """Insert or replace records by key in an in-memory collection (indexes are not updated)"""
+        collection = self._collection(file_name)
+        key = COLLECTION_KEYS[file_name]
+        positions = {record[key]: i for i, record in enumerate(collection)}
+        for record in records:
+            pos = positions.get(record[key])
+            if pos is None:
+                positions[record[key]] = len(collection)
+                collection.append(record)
+            else:
+                collection[pos] = record
+
+    def _read_journal(self, offset=0):
+        """Return the journal records after a byte offset, grouped by file name"""
+        if self.storage.journal_dir is None:
+            entries, self._journal_offset = [], 0
+        else:
+            entries, self._journal_offset = read_journal(self.storage.journal_dir, offset)
+        self._journal_stamp = self._journal_file_stamp()
+        self._journal_size = (self._journal_size if offset else 0) + len(entries)
+        by_file = {}
+        for entry in entries:
+            by_file.setdefault(entry["file"], []).append(COLLECTION_TYPES[entry["file"]].from_dict(entry["record"]))
+        if not offset:
+            self._journal_files = set()
+        self._journal_files.update(by_file)
+        return by_file
+
+    def _replay_journal(self, offset=0):
+        """Apply journal entries written after a byte offset of the journal"""
+        for file_name, records in self._read_journal(offset).items():
+            self._upsert(file_name, records)
+
+    def _merge_records(self, file_name, records):
+        """Apply records written by another process to memory and the indexes.
+
+        Existing records are updated in place. Returns False if a change could
+        not be applied to the indexes incrementally, so they must be rebuilt.
+        """
+        key = COLLECTION_KEYS[file_name]
+        pending = self._pending.get(file_name, {})
+        by_key = {"users.json": self._users_by_id, "items.json": self._items_by_id,
+                  "claims.json": self._claims_by_id}[file_name]
+        indexes_valid = True
+        for record in records:
+            if record[key] in pending:
+                continue  # The unsaved change made here wins
+            existing = by_key.get(record[key])
+            if existing is None:
+                {"users.json": self._add_user, "items.json": self._add_item,
+                 "claims.json": self._add_claim}[file_name](record)
+                continue
+            changed = [field for field in record.keys() if existing[field] != record[field]]
+            if changed == ["status"] and file_name == "items.json":
+                self._set_item_status(existing, record["status"])
+            elif changed == ["status"] and file_name == "claims.json":
+                self._set_claim_status(existing, record["status"])
+            elif changed and file_name == "users.json":
+                old_email = existing["email"]
+                existing.update(record.to_dict())
+                self._index_user(existing, old_email)
+            elif changed:
+                existing.update(record.to_dict())
+                indexes_valid = False
+        return indexes_valid
+
+    def _refresh_appended(self, stale, journal_stamp):
+        """Apply only what other processes appended since the last load.
+
+        Returns False without touching memory if a stale collection was
+        rewritten rather than appended to, or the journal was compacted.
+        """
+        if journal_stamp != self._journal_stamp:
+            if journal_stamp is None or journal_stamp[1] < self._journal_offset:
+                return False
+            if self._journal_stamp is not None and journal_stamp[0] != self._journal_stamp[0]:
+                return False
+        appended = {}
+        for file_name in stale:
+            records = self.storage.load_appended(file_name, COLLECTION_TYPES[file_name])
+            if records is None:
+                return False
+            appended[file_name] = records
+        if journal_stamp != self._journal_stamp:
+            for file_name, records in self._read_journal(self._journal_offset).items():
+                appended.setdefault(file_name, []).extend(records)
+        indexes_valid = True
+        with self._lock:
+            for file_name, records in appended.items():
+                indexes_valid = self._merge_records(file_name, records) and indexes_valid
+            if indexes_valid:
+                return True
+            version = self._version
+            shadow = self._shadow()
+            for file_name, attr in COLLECTION_ATTRS.items():
+                setattr(shadow, attr, list(self._collection(file_name)))
+        shadow._build_indexes()
+        self._install(shadow, version)
+        return True
+
+    def _shadow(self):
+        """Return an empty controller on the same storage, to load and index data in
+        without holding self._lock"""
+        shadow = object.__new__(DLFSController)
+        shadow.storage = self.storage
+        return shadow
+
+    def _install(self, shadow, version):
+        """Swap in the collections and indexes built in a shadow controller.
+
+        Records changed here since version are all pending, so only those
+        are re-indexed in the shadow before it replaces this controller's state.
+        """
+        with self._lock:
+            if self._version != version:
+                for file_name, records in self._pending.items():
+                    for record in records.values():
+                        shadow._reindex(file_name, record)
+            self.__dict__.update(vars(shadow))
+
+    def _reindex(self, file_name, record):
+        """Add a new record to the indexes, or re-index one that was changed in place.
+
+        Existing items and claims only change status in place; users may change any field.
+        """
+        if file_name == "items.json":
+            if record["item_id"] not in self._items_by_id:
+                self._add_item(record)
+                return
+            for item_ids in self._items_by_status.values():
+                item_ids.discard(record["item_id"])
+            self._items_by_status.setdefault(record["status"], set()).add(record["item_id"])
+            if self._columns is not None:
+                self._columns.set(self._item_positions[record["item_id"]], "status", record["status"])
+        elif file_name == "claims.json":
+            if record["claim_id"] not in self._claims_by_id:
+                self._add_claim(record)
+                return
+            for claim_ids in self._claims_by_status.values():
+                claim_ids.discard(record["claim_id"])
+            self._claims_by_status.setdefault(record["status"], set()).add(record["claim_id"])
+        else:
+            if record["id"] not in self._users_by_id:
+                self._add_user(record)
+                return
+            self._users_by_email = {email: user for email, user in self._users_by_email.items()
+                                    if user["id"] != record["id"]}
+            self._index_user(record)
+
+    def refresh(self):
+        """Reload data that other processes changed since it was loaded.
+
+        Changes are detected from file stamps (or table versions), which
+        costs a few stat calls. When other processes only appended (JSON Lines
+        files or the journal) just the new records are read and indexed.
+        Otherwise the changed collections are read again. Changes of this
+        controller that are not persisted yet are kept on top. Files are read
+        and indexed without holding self._lock, so readers are not blocked.
+        Returns True if anything was reloaded.
+        """
+        with self.storage.lock():
+            stale = [file_name for file_name in COLLECTION_KEYS if self.storage.is_stale(file_name)]
+            stamp = self._journal_file_stamp()
+            if not stale and stamp == self._journal_stamp:
+                return False
+            if not self._refresh_appended(stale, stamp):
+                with self._lock:
+                    version = self._version
+                    pending = {file_name: list(records.values()) for file_name, records in self._pending.items()}
+                    shadow = self._shadow()
+                    for file_name, attr in COLLECTION_ATTRS.items():
+                        if file_name not in stale:
+                            setattr(shadow, attr, list(self._collection(file_name)))
+                    shadow._journal_size = self._journal_size
+                    shadow._journal_files = set(self._journal_files)
+                for file_name in stale:
+                    setattr(shadow, COLLECTION_ATTRS[file_name], shadow._load(file_name))
+                # Reloaded snapshots or a compacted journal need the whole journal again
+                shrunk = stamp is None or stamp[1] < self._journal_offset
+                shadow._replay_journal(0 if stale or shrunk else self._journal_offset)
+                for file_name, records in pending.items():
+                    shadow._upsert(file_name, records)
+                shadow._build_indexes()
+                self._install(shadow, version)
+            if self._journal_size and not self._journal_in_use():
+                self.compact()
+            return True
+
+    def _build_indexes(self):
+        """Build lookup tables over the loaded records"""
+        self._items_by_id = {item["item_id"]: item for item in self.items}
+        # Position of each item in self.items, used to return results in report order
+        self._item_positions = {item["item_id"]: pos for pos, item in enumerate(self.items)}
+        # Sorted item IDs for listing by ID, built on first use
+        self._sorted_item_ids = None
+        self._claims_by_id = {claim["claim_id"]: claim for claim in self.claims}
+        self._claim_positions = {claim["claim_id"]: pos for pos, claim in enumerate(self.claims)}
+        # Items partitioned by type and by status, claims by status: value -> set of IDs
+        self._items_by_type = {}
+        self._items_by_status = {}
+        self._claims_by_status = {}
+        for claim in self.claims:
+            self._claims_by_status.setdefault(claim["status"], set()).add(claim["claim_id"])
+        self._item_tokens = {}  # token -> set of item IDs
+        self._items_by_location = {}  # normalised location -> set of item IDs
+        self._locations = None  # sorted distinct normalised locations, for prefix lookups
+        # Trigram indexes for substring search, built on first use: field -> TrigramIndex
+        self._ngram_indexes = {}
+        # Columnar copy of the items, built on first use
+        self._columns = None
+        # Deletion index over name tokens for fuzzy search, built on first use
+        self._fuzzy_index = None
+        for item in self.items:
+            self._index_item(item)
+        # Sort once here; items added later are inserted in place
+        self._locations = sorted(self._items_by_location)
+        self._users_by_id = {user["id"]: user for user in self.users}
+        self._users_by_email = {}
+        for user in self.users:
+            self._index_user(user)
+        self._next_user_id = max((user["id"] for user in self.users), default=0) + 1
+
+    def _add_item(self, item):
+        """Append an item to self.items and index it"""
+        self.items.append(item)
+        self._items_by_id[item["item_id"]] = item
+        self._item_positions[item["item_id"]] = len(self.items) - 1
+        if self._sorted_item_ids is not None:
+            # IDs are time-ordered, so this is nearly always an append
+            bisect.insort(self._sorted_item_ids, item["item_id"])
+        self._index_item(item)
+
+    def _add_claim(self, claim):
+        """Append a claim to self.claims and index it"""
+        self.claims.append(claim)
+        self._claims_by_id[claim["claim_id"]] = claim
+        self._claim_positions[claim["claim_id"]] = len(self.claims) - 1
+        self._claims_by_status.setdefault(claim["status"], set()).add(claim["claim_id"])
+
+    def _add_user(self, user):
+        """Append a user to self.users and index it"""
+        self.users.append(user)
+        self._users_by_id[user["id"]] = user
+        self._index_user(user)
+        self._next_user_id = max(self._next_user_id, user["id"] + 1)
+
+    def _index_item(self, item):
+        """Add an item to the search indexes and partitions"""
+        self._items_by_type.setdefault(item["item_type"], set()).add(item["item_id"])
+        self._items_by_status.setdefault(item["status"], set()).add(item["item_id"])
+        for token in set(tokenize(item["name"]) + tokenize(item["description"])):
+            self._item_tokens.setdefault(token, set()).add(item["item_id"])
+        for field, index in self._ngram_indexes.items():
+            index.add(item["item_id"], item[field])
+        if self._columns is not None:
+            self._columns.append(item)
+        if self._fuzzy_index is not None:
+            for token in tokenize(item["name"]):
+                self._fuzzy_index.add(self._item_positions[item["item_id"]], token)
+        location = normalize_location(item["location"])
+        if location not in self._items_by_location:
+            self._items_by_location[location] = set()
+            if self._locations is not None:
+                bisect.insort(self._locations, location)
+        self._items_by_location[location].add(item["item_id"])
+
+    def _ngram_index(self, field):
+        """Return the trigram index for an item field, building it if needed"""
+        index = self._ngram_indexes.get(field)
+        if index is None:
+            index = TrigramIndex()
+            for item in self.items:
+                index.add(item["item_id"], item[field])
+            self._ngram_indexes[field] = index
+        return index
+
+    def _fuzzy(self):
+        """Return the fuzzy search index, building it if needed"""
+        if self._fuzzy_index is None:
+            index = DeletionIndex()
+            # Keyed by position so that ranked results can be put in report order cheaply
+            for pos, item in enumerate(self.items):
+                for token in tokenize(item["name"]):
+                    index.add(pos, token)
+            self._fuzzy_index = index
+        return self._fuzzy_index
+
+    def _items_in_order(self, item_ids):
+        """Return the items with the given IDs in the order they were reported"""
+        return [self._items_by_id[item_id] for item_id in sorted(item_ids, key=self._item_positions.get)]
+
+    def _set_item_status(self, item, status):
+        """Change an item's status and move it to the matching partition"""
+        self._items_by_status[item["status"]].discard(item["item_id"])
+        item["status"] = status
+        self._items_by_status.setdefault(status, set()).add(item["item_id"])
+        if self._columns is not None:
+            self._columns.set(self._item_positions[item["item_id"]], "status", status)
+
+    def columns(self):
+        """Return the columnar item store, building it on first use"""
+        with self._lock:
+            if self._columns is None:
+                self._columns = ItemColumns(self.items)
+            return self._columns
+
+    def filter_items(self, **criteria):
+        """Return items matching all criteria on item_type, status and location"""
+        # The writer or refresh thread may append rows meanwhile
+        with self._lock:
+            return [self.items[pos] for pos in self.columns().filter(**criteria)]
+
+    def count_items(self, **criteria):
+        """Return the number of items matching all criteria on item_type, status and location"""
+        with self._lock:
+            return self.columns().count(**criteria)
+
+    def _set_claim_status(self, claim, status):
+        """Change a claim's status and move it to the matching partition"""
+        self._claims_by_status[claim["status"]].discard(claim["claim_id"])
+        claim["status"] = status
+        self._claims_by_status.setdefault(status, set()).add(claim["claim_id"])
+
+    def _search_substring(self, field, text):
+        """Return items whose field contains text (case-insensitive), in report order"""
+        text = text.lower()
+        candidates = self._ngram_index(field).candidates(text)
+        if candidates is None:
+            # Query too short to narrow down, fall back to a scan
+            return [item for item in self.items if text in item[field].lower()]
+        return [item for item in self._items_in_order(candidates) if text in item[field].lower()]
+
+    def _index_user(self, user, old_email=None):
+        """Add a user to the email index, dropping the entry for a previous email"""
+        if old_email is not None:
+            self._users_by_email.pop(normalize_email(old_email), None)
+        self._users_by_email[normalize_email(user["email"])] = user
 
     def save_all(self):
-        """Save all in-memory data back to JSON files"""
-        save_data("users.json", self.users)
-        save_data("items.json", self.items)
-        save_data("claims.json", self.claims)
+        """Save all in-memory data back to storage"""
+        with self.storage.lock():
+            # Copy the lists so that other threads can keep working while they are written
+            with self._lock:
+                snapshot = {file_name: list(self._collection(file_name)) for file_name in COLLECTION_KEYS}
+            for file_name, records in snapshot.items():
+                self.storage.save(file_name, records)
+
+    def compact(self):
+        """Write snapshots of the collections changed in the journal and empty it"""
+        with self.storage.lock():
+            self.refresh()
+            with self._lock:
+                # Collections without journal entries or pending changes are up to date
+                files = self._journal_files | set(self._pending)
+                self._pending = {}
+                snapshot = {file_name: list(self._collection(file_name)) for file_name in files}
+            for file_name, records in snapshot.items():
+                self.storage.save(file_name, records)
+            if self.storage.journal_dir is not None:
+                clear_journal(self.storage.journal_dir)
+            with self._lock:
+                self._journal_size = 0
+                self._journal_offset = 0
+                self._journal_stamp = self._journal_file_stamp()
+                self._journal_files = set()
+
+    def _journal_in_use(self):
+        """Return True if changes are written to the journal: in journaled mode, or
+        while a group commit writer runs"""
+        return self.journaled or self._writer is not None
+
+    def _commit_group(self):
+        """Group commit work, run by the GroupCommitWriter thread.
+
+        Mutations append themselves to the journal. This writes changes left
+        pending (e.g. by a failed append), makes the journal durable with one
+        fsync for the whole group and compacts it every SNAPSHOT_INTERVAL entries.
+        """
+        self.flush()
+        sync_journal(self.storage.journal_dir)
+        if self._journal_size >= SNAPSHOT_INTERVAL:
+            self.compact()
+
+    def _mark(self, changes):
+        """Mark changed records given as (file name, record) pairs as pending (hold self._lock)"""
+        self._version += 1
+        for file_name, record in changes:
+            self._pending.setdefault(file_name, {})[record[COLLECTION_KEYS[file_name]]] = record
+
+    def _autoflush(self):
+        """Flush after a mutation unless flushes are batched or scheduled elsewhere"""
+        # Inside a batch the flush happens once, when the batch ends
+        if self._batch_depth:
+            return
+        if self._writer is not None or self.autoflush:
+            self._persist()
+
+    def _persist(self):
+        """Flush pending changes. With a group commit writer they are appended to
+        the journal, and the writer is told to sync them with its next group."""
+        count = self.flush()
+        writer = self._writer
+        if count and writer is not None:
+            writer.notify(count)
+
+    def start_group_commit(self, max_latency=0.05, max_records=500):
+        """Persist changes through the journal and sync them in groups, see GroupCommitWriter"""
+        if self.storage.journal_dir is None:
+            raise ValueError(f"{type(self.storage).__name__} does not support group commit")
+        if self._writer is None:
+            self._writer = GroupCommitWriter(self, max_latency, max_records)
+        return self._writer
+
+    def stop_group_commit(self):
+        """Write outstanding changes and go back to flushing after every mutation"""
+        writer = self._writer
+        if writer is None:
+            return
+        try:
+            writer.stop()
+        finally:
+            with self.storage.lock():
+                self._writer = None
+                # Snapshots written after this must not be overridden by older journal entries
+                if self._journal_size and not self.journaled:
+                    self.compact()
+
+    def has_pending(self):
+        """Return True if there are changes that have not been persisted yet"""
+        return bool(self._pending)
+
+    def flush(self):
+        """Persist pending changes, writing only the collections that were modified.
+
+        Returns the number of records written.
+        """
+        if not self._pending:
+            return 0
+        with self.storage.lock():
+            # Merge changes made by other processes instead of overwriting them
+            self.refresh()
+            journal = self._journal_in_use()
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if not journal:
+                    # Copy what is written, so the lock is not held during the I/O
+                    snapshot = {file_name: list(self._collection(file_name)) for file_name in pending}
+            try:
+                if not journal:
+                    for file_name, records in pending.items():
+                        self.storage.apply(file_name, list(records.values()), snapshot[file_name])
+                else:
+                    entries = [{"op": "put", "file": file_name, "record": record}
+                               for file_name, records in pending.items() for record in records.values()]
+                    # A group commit writer syncs the journal once for its whole group
+                    append_journal(entries, self.storage.journal_dir, sync=self._writer is None)
+            except BaseException:
+                with self._lock:
+                    # Keep the changes pending so that the next flush writes them
+                    for file_name, records in pending.items():
+                        records.update(self._pending.get(file_name, {}))
+                        self._pending[file_name] = records
+                raise
+            count = sum(len(records) for records in pending.values())
+            if not journal:
+                return count
+            with self._lock:
+                self._journal_stamp = self._journal_file_stamp()
+                self._journal_offset = self._journal_stamp[1]
+                self._journal_size += len(entries)
+                self._journal_files.update(pending)
+            # A group commit writer compacts from its own thread
+            if self._writer is None and self._journal_size >= SNAPSHOT_INTERVAL:
+                self.compact()
+            return count
+
+    @contextmanager
+    def batch(self):
+        """Group several mutations so that they are persisted by a single flush"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._persist()
 
     def login(self, email, password):
         """Authenticate user by email and password"""
-        for user in self.users:
-            if user["email"] == email and user["password"] == password:
-                return user  # Return user dictionary if credentials match
+        user = self._users_by_email.get(normalize_email(email))
+        if user is not None and user["password"] == password:
+            return user  # Return user record if credentials match
         return None
 
+    def add_user(self, name, email, password, role="user"):
+        """Create and store a new user account, return None if the email is taken"""
+        with self.storage.lock():
+            # Another process may have added users since they were loaded
+            self.refresh()
+            with self._lock:
+                if normalize_email(email) in self._users_by_email:
+                    return None
+                user = User(self._next_user_id, name, email, password, role)
+                self._add_user(user)
+                self._mark([("users.json", user)])
+            # Write the user before the lock is released, even when flushes are
+            # batched, so no other process can take its ID
+            self._persist()
+            return user.user_id
+
+    def update_user(self, user_id, **fields):
+        """Change fields of an existing user and keep the email index in sync"""
+        with self._lock:
+            user = self._users_by_id.get(user_id)
+            if user is None:
+                return False
+            old_email = user["email"]
+            user.update(fields)
+            self._index_user(user, old_email)
+            self._mark([("users.json", user)])
+        self._autoflush()
+        return True
+
     def report_item(self, name, description, location, item_type, user_id):
         """Create and store a new reported item"""
         item = ReportedItem(name, description, location, item_type)
-        self.items.append(item.__dict__)  # Store as dictionary
-        self.save_all()
+        with self._lock:
+            self._add_item(item)
+            self._mark([("items.json", item)])
+        self._autoflush()
         return item.item_id  # Return generated item ID
 
-    def search_items(self, keyword):
-        """Search items by keyword in the name"""
-        return [item for item in self.items if keyword.lower() in item["name"].lower()]
+    def bulk_report_items(self, rows):
+        """Report many items and persist them with a single flush.
+
+        rows is an iterable of dicts with name, description, location and
+        item_type. Invalid rows are skipped. Returns (item IDs, errors) where
+        errors lists (row number, message) pairs. If reading rows raises,
+        nothing is imported.
+        """
+        items = []
+        errors = []
+        # Read every row before applying any, so a failing read leaves no partial import
+        for number, row in enumerate(rows, 1):
+            error = validate_item_row(row)
+            if error:
+                errors.append((number, error))
+                continue
+            items.append(ReportedItem(str(row["name"]).strip(), str(row.get("description") or ""),
+                                      str(row["location"]).strip(), str(row["item_type"]).strip().lower()))
+        with self._lock:
+            for item in items:
+                self._add_item(item)
+            self._mark([("items.json", item) for item in items])
+        self._autoflush()
+        return [item.item_id for item in items], errors
+
+    def list_items(self, cursor=None, limit=PAGE_SIZE, order="reported"):
+        """Return a page of items and the cursor for the next page.
+
+        order is "reported" (the order items were reported) or "item_id".
+        Pass the returned cursor back to get the following page; it is None
+        after the last page. Items added meanwhile never shift a page.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        with self._lock:
+            if cursor is not None and cursor not in self._items_by_id:
+                raise ValueError(f"Unknown cursor: {cursor}")
+            if order == "reported":
+                start = 0 if cursor is None else self._item_positions[cursor] + 1
+                page = self.items[start:start + limit]
+            elif order == "item_id":
+                if self._sorted_item_ids is None:
+                    self._sorted_item_ids = sorted(self._items_by_id)
+                start = 0 if cursor is None else bisect.bisect_right(self._sorted_item_ids, cursor)
+                page = [self._items_by_id[item_id] for item_id in self._sorted_item_ids[start:start + limit]]
+            else:
+                raise ValueError(f"Unknown order: {order}")
+            # Only hand out a cursor when there is another page to fetch
+            more = start + len(page) < len(self.items)
+        return page, page[-1]["item_id"] if page and more else None
+
+    def search_items(self, keyword, whole_words=False):
+        """Search items by keyword in the name.
+
+        With whole_words=True every word of the keyword must appear in the
+        item's name or description; the token index is used instead of a scan.
+        """
+        if whole_words:
+            return self._search_tokens(tokenize(keyword))
+        return self._search_substring("name", keyword)
+
+    def fuzzy_search_items(self, keyword, max_distance=FUZZY_MAX_DISTANCE, limit=None):
+        """Search item names allowing typos, best matches first.
+
+        Every word of the keyword must be within max_distance edits of a word
+        in the name (short words allow fewer edits). Items are ranked by the
+        total number of edits, ties in report order, and at most limit are
+        returned.
+        """
+        tokens = tokenize(keyword)
+        if not tokens:
+            return []
+        with self._lock:
+            index = self._fuzzy()
+            # For each word of the keyword: edits -> positions of items needing that many
+            word_tiers = []
+            for token in set(tokens):
+                # Typos in very short words would match almost anything
+                allowed = 0 if len(token) <= 2 else 1 if len(token) <= 5 else max_distance
+                words = {}
+                for word, distance in index.lookup(token, allowed).items():
+                    words.setdefault(distance, []).append(index.words[word])
+                if not words:
+                    return []
+                # Keep each item only in its best tier; the index's own sets are never modified
+                tiers = {}
+                seen = set()
+                for distance in sorted(words):
+                    tiers[distance] = set().union(*words[distance]) - seen
+                    seen |= tiers[distance]
+                word_tiers.append(tiers)
+            # Combine the words' tiers with set intersections: total edits -> item positions
+            ranked = word_tiers[0]
+            for tiers in word_tiers[1:]:
+                combined = {}
+                for score, positions in ranked.items():
+                    for distance, matches in tiers.items():
+                        both = positions & matches
+                        if both:
+                            combined.setdefault(score + distance, set()).update(both)
+                ranked = combined
+            results = []
+            for score in sorted(ranked):
+                if limit is None:
+                    positions = sorted(ranked[score])
+                else:
+                    positions = heapq.nsmallest(limit - len(results), ranked[score])
+                results.extend(self.items[pos] for pos in positions)
+                if limit is not None and len(results) >= limit:
+                    break
+            return results
+
+    def search_by_location(self, location, match="substring"):
+        """Search items by location.
+
+        match is "substring" (location contains the text), "exact" or "prefix"
+        (normalised location equals or starts with the text).
+        """
+        if match == "substring":
+            return self._search_substring("location", location)
+        location = normalize_location(location)
+        if match == "exact":
+            matches = self._items_by_location.get(location, set())
+        elif match == "prefix":
+            matches = set()
+            start = bisect.bisect_left(self._locations, location)
+            for name in self._locations[start:]:
+                if not name.startswith(location):
+                    break
+                matches |= self._items_by_location[name]
+        else:
+            raise ValueError(f"Unknown match mode: {match}")
+        return self._items_in_order(matches)
+
+    def items_by_type(self, item_type):
+        """Return all items of a type ("lost" or "found")"""
+        return self._items_in_order(self._items_by_type.get(item_type, set()))
+
+    def items_by_status(self, status):
+        """Return all items with the given status"""
+        return self._items_in_order(self._items_by_status.get(status, set()))
+
+    def claims_by_status(self, status):
+        """Return all claims with the given status, in the order they were made"""
+        claim_ids = sorted(self._claims_by_status.get(status, set()), key=self._claim_positions.get)
+        return [self._claims_by_id[claim_id] for claim_id in claim_ids]
+
+    def _search_tokens(self, tokens):
+        """Return items containing all tokens by intersecting posting lists"""
+        if not tokens:
+            return []
+        postings = sorted((self._item_tokens.get(token, set()) for token in set(tokens)), key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches &= posting
+            if not matches:
+                break
+        return self._items_in_order(matches)
 
     def claim_item(self, user_id, item_id):
-        """Submit a claim for a found item"""
-        claim = Claim(user_id, item_id)
-        self.claims.append(claim.__dict__)  # Store as dictionary
-        self.save_all()
+        """Submit a claim for a found item, return its ID or None if there is no such item"""
+        with self._lock:
+            if item_id not in self._items_by_id:
+                return None
+            claim = Claim(user_id, item_id)
+            self._add_claim(claim)
+            self._mark([("claims.json", claim)])
+        self._autoflush()
         return claim.claim_id  # Return claim ID
 
+    def get_item(self, item_id):
+        """Return the item with the given ID, or None"""
+        return self._items_by_id.get(item_id)
+
+    def get_claim(self, claim_id):
+        """Return the claim with the given ID, or None"""
+        return self._claims_by_id.get(claim_id)
+
     def approve_claim(self, claim_id):
         """Approve a pending claim and update item status"""
-        for claim in self.claims:
-            if claim["claim_id"] == claim_id:
-                claim["status"] = "approved"
-                # Update item status as claimed
-                for item in self.items:
-                    if item["item_id"] == claim["item_id"]:
-                        item["status"] = "claimed"
-                self.save_all()
-                return True
-        return False
+        with self._lock:
+            claim = self._claims_by_id.get(claim_id)
+            if claim is None:
+                return False
+            self._approve(claim)
+        self._autoflush()
+        return True
+
+    def _approve(self, claim):
+        """Approve a claim, mark its item as claimed and queue both changes (hold self._lock)"""
+        self._set_claim_status(claim, "approved")
+        changes = [("claims.json", claim)]
+        # Update item status as claimed
+        item = self._items_by_id.get(claim["item_id"])
+        if item is not None:
+            self._set_item_status(item, "claimed")
+            changes.append(("items.json", item))
+        self._mark(changes)
+
+    def approve_claims(self, claim_ids=None, all_pending=False, **criteria):
+        """Approve many claims and persist them with a single flush.
+
+        Pass a list of claim IDs, criteria on claim fields to approve the
+        matching pending claims (e.g. user_id=3), or all_pending=True to
+        approve every pending claim. Only pending claims are approved, and
+        each ID once. Returns (approved claim IDs, errors) where errors lists
+        (claim ID, message) pairs for the IDs that were skipped.
+        """
+        unknown = [field for field in criteria if field not in Claim.FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown claim fields: {', '.join(unknown)}")
+        if claim_ids is not None and (all_pending or criteria):
+            raise ValueError("Pass either claim IDs or criteria/all_pending, not both")
+        if claim_ids is None and not criteria and not all_pending:
+            # Approving every claim must be asked for explicitly
+            raise ValueError("Pass claim IDs, criteria or all_pending=True")
+        errors = []
+        with self._lock:
+            if claim_ids is None:
+                claims = [claim for claim in self.claims_by_status("pending")
+                          if all(claim[field] == value for field, value in criteria.items())]
+            else:
+                claims = []
+                # dict.fromkeys drops repeated IDs but keeps their order
+                for claim_id in dict.fromkeys(claim_ids):
+                    claim = self._claims_by_id.get(claim_id)
+                    if claim is None:
+                        errors.append((claim_id, "not found"))
+                    elif claim["status"] != "pending":
+                        errors.append((claim_id, f"already {claim['status']}"))
+                    else:
+                        claims.append(claim)
+            for claim in claims:
+                self._approve(claim)
+        # Every transition above is written by this one flush
+        self._autoflush()
+        return [claim["claim_id"] for claim in claims], errors
+
+
+# === Group Commit ===
+class GroupCommitWriter:
+    """Background thread that makes a controller's journal durable in groups.
+
+    While it runs, every mutation appends its records to the journal before
+    returning, which costs one write and no fsync, so a crash of the process
+    loses no acknowledged change. The writer syncs the journal once
+    max_records records are waiting, or max_latency seconds after the oldest
+    one, whichever comes first, sharing one fsync across the group; it also
+    folds the journal into snapshots every SNAPSHOT_INTERVAL entries. A power
+    failure can lose up to max_latency seconds of changes, so call flush()
+    where a change must be on disk. flush() blocks until everything appended
+    before the call has been synced, and raises the error of any failed group
+    since the last flush(). Failed groups are retried.
+    """
+    def __init__(self, controller, max_latency=0.05, max_records=500):
+        self.controller = controller
+        self.max_latency = max_latency
+        self.max_records = max_records
+        self._cond = threading.Condition()
+        self._queued = 0  # Records appended since the last group started
+        self._oldest = None  # time.monotonic() of the oldest waiting change
+        self._requested = 0  # Number of flush() barriers requested
+        self._completed = 0  # Barriers covered by a finished flush
+        self._stopping = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="dlfs-group-commit", daemon=True)
+        self._thread.start()
+        # Do not lose queued changes when the interpreter exits
+        atexit.register(self.stop)
+
+    def notify(self, count=1):
+        """Tell the writer that count records were appended to the journal"""
+        with self._cond:
+            self._queued += count
+            if self._oldest is None:
+                # Start the latency timer of the writer
+                self._oldest = time.monotonic()
+                self._cond.notify_all()
+            elif self._queued >= self.max_records:
+                self._cond.notify_all()
+
+    def _wait_for_work(self):
+        """Block until a group is due; hold self._cond"""
+        while not (self._stopping or self._requested > self._completed or self._queued >= self.max_records):
+            if self._oldest is None:
+                self._cond.wait()
+                continue
+            remaining = self._oldest + self.max_latency - time.monotonic()
+            if remaining <= 0:
+                return
+            self._cond.wait(remaining)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._wait_for_work()
+                requested = self._requested
+                stopping = self._stopping
+                self._queued = 0
+                self._oldest = None
+            try:
+                self.controller._commit_group()
+            except Exception as exc:
+                with self._cond:
+                    # Kept until a flush() barrier reports it
+                    self._error = exc
+                    if not stopping:
+                        # Retry the group after max_latency
+                        self._oldest = time.monotonic()
+            with self._cond:
+                self._completed = requested
+                self._cond.notify_all()
+            if stopping:
+                return
+
+    def _raise_error(self):
+        """Raise the error of a failed write that was not reported yet; hold self._cond"""
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def flush(self):
+        """Block until every change appended so far has been synced"""
+        with self._cond:
+            if not self._thread.is_alive():
+                self._raise_error()
+                self.controller._commit_group()
+                return
+            self._requested += 1
+            target = self._requested
+            self._cond.notify_all()
+            while self._completed < target:
+                self._cond.wait()
+            self._raise_error()
+
+    def stop(self):
+        """Write outstanding changes and end the writer thread.
+
+        Raises the error of a failed write that flush() did not report yet.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+        atexit.unregister(self.stop)
+        with self._cond:
+            self._raise_error()
+
+
+# === Async Controller ===
+class AsyncDLFSController:
+    """Awaitable wrapper around DLFSController for asyncio front ends.
+
+    Mutations are applied in memory right away and persisted by a background
+    flush that runs in a worker thread, so the event loop never waits for a
+    file to be written. Mutations made while a flush is running are coalesced
+    into the next one. Await flush() when a change must be on disk before
+    answering a request.
+    """
+    def __init__(self, controller=None):
+        self.controller = controller or DLFSController()
+        # Persistence is scheduled here instead of after every mutation
+        self.controller.autoflush = False
+        self._flush_task = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _schedule_flush(self):
+        # Imported on first use, it is slow to import and only async front ends need it
+        import asyncio
+        if self._flush_task is None and self.controller.has_pending():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        import asyncio
+        try:
+            while self.controller.has_pending():
+                await asyncio.to_thread(self.controller.flush)
+        finally:
+            self._flush_task = None
+
+    async def _mutate(self, method, *args, **kwargs):
+        result = method(*args, **kwargs)
+        self._schedule_flush()
+        return result
+
+    async def _read(self, method, *args, **kwargs):
+        # A flush in its thread may be merging changes from other processes. It
+        # reads and indexes files without the lock, so this only waits for the swap
+        with self.controller._lock:
+            return method(*args, **kwargs)
+
+    async def flush(self):
+        """Wait until every change made so far has been persisted"""
+        import asyncio
+        self._schedule_flush()
+        while self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+
+    async def close(self):
+        """Persist outstanding changes and hand flushing back to the controller"""
+        await self.flush()
+        self.controller.autoflush = True
+
+    async def refresh(self):
+        """Pick up changes made by other processes"""
+        import asyncio
+        return await asyncio.to_thread(self.controller.refresh)
+
+    async def login(self, email, password):
+        return await self._read(self.controller.login, email, password)
+
+    async def add_user(self, name, email, password, role="user"):
+        import asyncio
+        # Needs the data directory lock, which a running flush may hold
+        result = await asyncio.to_thread(self.controller.add_user, name, email, password, role)
+        self._schedule_flush()
+        return result
+
+    async def update_user(self, user_id, **fields):
+        return await self._mutate(self.controller.update_user, user_id, **fields)
+
+    async def report_item(self, name, description, location, item_type, user_id):
+        return await self._mutate(self.controller.report_item, name, description, location, item_type, user_id)
+
+    async def bulk_report_items(self, rows):
+        import asyncio
+        # Reading the rows may block on a file, so it runs in a worker thread
+        result = await asyncio.to_thread(self.controller.bulk_report_items, rows)
+        self._schedule_flush()
+        return result
+
+    async def claim_item(self, user_id, item_id):
+        return await self._mutate(self.controller.claim_item, user_id, item_id)
+
+    async def approve_claim(self, claim_id):
+        return await self._mutate(self.controller.approve_claim, claim_id)
+
+    async def approve_claims(self, claim_ids=None, all_pending=False, **criteria):
+        return await self._mutate(self.controller.approve_claims, claim_ids, all_pending, **criteria)
+
+    async def list_items(self, cursor=None, limit=PAGE_SIZE, order="reported"):
+        return await self._read(self.controller.list_items, cursor, limit, order)
+
+    async def search_items(self, keyword, whole_words=False):
+        return await self._read(self.controller.search_items, keyword, whole_words)
+
+    async def fuzzy_search_items(self, keyword, max_distance=FUZZY_MAX_DISTANCE, limit=None):
+        return await self._read(self.controller.fuzzy_search_items, keyword, max_distance, limit)
+
+    async def search_by_location(self, location, match="substring"):
+        return await self._read(self.controller.search_by_location, location, match)
+
+    async def items_by_type(self, item_type):
+        return await self._read(self.controller.items_by_type, item_type)
+
+    async def items_by_status(self, status):
+        return await self._read(self.controller.items_by_status, status)
+
+    async def claims_by_status(self, status):
+        return await self._read(self.controller.claims_by_status, status)
+
+    async def get_item(self, item_id):
+        return await self._read(self.controller.get_item, item_id)
+
+    async def get_claim(self, claim_id):
+        return await self._read(self.controller.get_claim, claim_id)
+
+
+def read_item_rows(path):
+    """Yield item rows from a CSV file (with a header row) or a JSON Lines file.
+
+    A JSON line that cannot be parsed is yielded as a ValueError, which
+    validate_item_row reports like any other invalid row.
+    """
+    # utf-8-sig also reads files saved with a byte order mark, as Excel does
+    with open(path, "r", newline="", encoding="utf-8-sig") as file:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        yield ValueError(f"invalid JSON: {exc.msg}")
+
+
+def import_items_file(path, controller=None):
+    """Import reported items from a CSV or JSON Lines file in one batch.
+
+    Returns (item IDs, errors, seconds taken).
+    """
+    controller = controller or get_controller()
+    start = time.perf_counter()
+    item_ids, errors = controller.bulk_report_items(read_item_rows(path))
+    return item_ids, errors, time.perf_counter() - start
+
+
+def migrate_json_to_sqlite(db_path, data_dir=None):
+    """Copy the JSON data directory (including its journal) into a SQLite database"""
+    storage = JsonStorage(data_dir)
+    # Keep other processes from changing the files until they are copied
+    with storage.lock():
+        source = DLFSController(storage=storage)
+        target = SQLiteStorage(db_path)
+        with target.lock():
+            for file_name in COLLECTION_KEYS:
+                target.save(file_name, source._collection(file_name))
+    return target
 
 
 # === Menus ===
-controller = DLFSController()
+_controller = None
+
+
+def get_controller():
+    """Return the shared controller, loading the data on first call"""
+    global _controller
+    if _controller is None:
+        if SQLITE_PATH:
+            _controller = DLFSController(storage=SQLiteStorage(SQLITE_PATH))
+        else:
+            _controller = DLFSController(journaled=JOURNALED)
+    return _controller
+
+
+def __getattr__(name):
+    # Keep dlfs.controller working without loading data at import time
+    if name == "controller":
+        return get_controller()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Columns shown for items and claims: (field, label)
+ITEM_COLUMNS = (("item_id", "Item ID"), ("name", "Name"), ("location", "Location"),
+                ("item_type", "Type"), ("status", "Status"))
+CLAIM_COLUMNS = (("claim_id", "Claim ID"), ("item_id", "Item ID"), ("user_id", "User ID"))
+
+
+def render_rows(rows, columns, align=False, max_width=None, out=None):
+    """Format rows and write them to out (stdout by default) in a single write.
+
+    Each row is shown as "Label: value, ..." or, with align=True, as a table
+    under a header line. Values longer than max_width are cut short with "...".
+    """
+    def cell(value):
+        text = str(value)
+        if max_width is not None and len(text) > max_width:
+            text = text[:max(max_width - 3, 0)] + "..."
+        return text
+
+    cells = [[cell(row[field]) for field, _ in columns] for row in rows]
+    if align:
+        labels = [label for _, label in columns]
+        widths = [max(len(text) for text in column) for column in zip(labels, *cells)]
+        lines = ["  ".join(text.ljust(width) for text, width in zip(line, widths)).rstrip()
+                 for line in [labels, ["-" * width for width in widths]] + cells]
+    else:
+        lines = [", ".join(f"{label}: {text}" for (_, label), text in zip(columns, line)) for line in cells]
+    out = out or sys.stdout
+    out.write("".join(line + "\n" for line in lines))
+    out.flush()
 
 
 def user_menu(user):
     """Menu for regular users"""
+    controller = get_controller()
     while True:
+        # Pick up items reported from other kiosks
+        controller.refresh()
         print("\n--- User Menu ---")
         print("1. Report Lost Item")
         print("2. Report Found Item")
@@ -179,11 +2371,17 @@ def user_menu(user):
             sub_choice = input("Choose an option: ")
 
             if sub_choice == "1":
-                # View all items
-                if controller.items:
+                # View all items, one page at a time
+                items, cursor = controller.list_items()
+                if items:
                     print("\n--- All Items ---")
-                    for item in controller.items:
-                        print(f"Item ID: {item['item_id']}, Name: {item['name']}, Location: {item['location']}, Type: {item['item_type']}, Status: {item['status']}")
+                    while True:
+                        render_rows(items, ITEM_COLUMNS)
+                        if cursor is None:
+                            break
+                        if input("Press Enter for more items, or q to stop: ").strip().lower() == "q":
+                            break
+                        items, cursor = controller.list_items(cursor)
                 else:
                     print("No items in the system.")
 
@@ -193,19 +2391,23 @@ def user_menu(user):
                 results = controller.search_items(keyword)
                 if results:
                     print("\n--- Search Results ---")
-                    for item in results:
-                        print(f"Item ID: {item['item_id']}, Name: {item['name']}, Location: {item['location']}, Type: {item['item_type']}, Status: {item['status']}")
+                    render_rows(results, ITEM_COLUMNS)
                 else:
-                    print("No items found with that keyword.")
+                    # Fall back to typo-tolerant matches before giving up
+                    results = controller.fuzzy_search_items(keyword, limit=PAGE_SIZE)
+                    if results:
+                        print("\n--- Close Matches ---")
+                        render_rows(results, ITEM_COLUMNS)
+                    else:
+                        print("No items found with that keyword.")
 
             elif sub_choice == "3":
                 # Search by location
                 location = input("Enter location: ")
-                results = [item for item in controller.items if location.lower() in item['location'].lower()]
+                results = controller.search_by_location(location)
                 if results:
                     print("\n--- Items Found in Location ---")
-                    for item in results:
-                        print(f"Item ID: {item['item_id']}, Name: {item['name']}, Location: {item['location']}, Type: {item['item_type']}, Status: {item['status']}")
+                    render_rows(results, ITEM_COLUMNS)
                 else:
                     print("No items found in that location.")
 
@@ -214,11 +2416,10 @@ def user_menu(user):
                 print("Choose type: 1 for Lost, 2 for Found")
                 t = input("Enter choice: ")
                 item_type = "lost" if t == "1" else "found"
-                results = [item for item in controller.items if item['item_type'] == item_type]
+                results = controller.items_by_type(item_type)
                 if results:
                     print(f"\n--- {item_type.capitalize()} Items ---")
-                    for item in results:
-                        print(f"Item ID: {item['item_id']}, Name: {item['name']}, Location: {item['location']}, Status: {item['status']}")
+                    render_rows(results, [column for column in ITEM_COLUMNS if column[0] != "item_type"])
                 else:
                     print(f"No {item_type} items found.")
 
@@ -226,7 +2427,10 @@ def user_menu(user):
             # Claim an item
             item_id = input("Enter Item ID to claim: ")
             claim_id = controller.claim_item(user["id"], item_id)
-            print(f"Claim submitted. Claim ID: {claim_id}")
+            if claim_id is None:
+                print("Item not found.")
+            else:
+                print(f"Claim submitted. Claim ID: {claim_id}")
 
         elif choice == "5":
             # Logout
@@ -235,10 +2439,14 @@ def user_menu(user):
 
 def admin_menu(admin):
     """Menu for admins"""
+    controller = get_controller()
     while True:
+        controller.refresh()
         print("\n--- Admin Menu ---")
         print("1. Approve Claim")
-        print("2. Logout")
+        print("2. View Pending Claims")
+        print("3. Approve Multiple Claims")
+        print("4. Logout")
         choice = input("Choose an option: ")
 
         if choice == "1":
@@ -248,11 +2456,35 @@ def admin_menu(admin):
             else:
                 print("Claim not found.")
         elif choice == "2":
+            # View pending claims
+            claims = controller.claims_by_status("pending")
+            if claims:
+                print("\n--- Pending Claims ---")
+                render_rows(claims, CLAIM_COLUMNS)
+            else:
+                print("No pending claims.")
+        elif choice == "3":
+            # Approve several claims at once
+            text = input("Enter Claim IDs separated by commas, or 'all' for every pending claim: ").strip()
+            if text.lower() == "all":
+                count = len(controller.claims_by_status("pending"))
+                if input(f"Approve all {count} pending claims? (y/n): ").strip().lower() != "y":
+                    print("No claims approved.")
+                    continue
+                approved, errors = controller.approve_claims(all_pending=True)
+            else:
+                claim_ids = [claim_id.strip() for claim_id in text.split(",") if claim_id.strip()]
+                approved, errors = controller.approve_claims(claim_ids)
+            print(f"{len(approved)} claims approved.")
+            for claim_id, error in errors:
+                print(f"Claim {claim_id} skipped: {error}")
+        elif choice == "4":
             break
 
 
 def main():
     """Main menu for login and exit"""
+    controller = get_controller()
     while True:
         print("\n--- DLFS Main Menu ---")
         print("1. Login")
@@ -276,4 +2508,36 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    args = sys.argv[1:]
+    if "--no-journal" in args:
+        # python dlfs.py --no-journal (rewrite the data files on every change)
+        args.remove("--no-journal")
+        JOURNALED = False
+    if "--sqlite" in args[:-1]:
+        # python dlfs.py --sqlite data/dlfs.db (use a database made by migrate-sqlite)
+        index = args.index("--sqlite")
+        SQLITE_PATH = args[index + 1]
+        del args[index:index + 2]
+    if len(args) == 2 and args[0] == "migrate-sqlite":
+        # python dlfs.py migrate-sqlite data/dlfs.db
+        migrate_json_to_sqlite(args[1]).close()
+        print(f"Migrated {DATA_DIR} to {args[1]}")
+    elif len(args) == 2 and args[0] == "convert":
+        # python dlfs.py convert jsonl
+        convert_data_dir(args[1])
+        print(f"Converted {DATA_DIR} to {args[1]}")
+    elif len(args) == 2 and args[0] == "import":
+        # python dlfs.py import found_items.csv
+        try:
+            item_ids, errors, seconds = import_items_file(args[1])
+        except (OSError, ValueError, csv.Error) as exc:
+            # ValueError includes UnicodeDecodeError for files that are not UTF-8
+            sys.exit(f"Import failed, nothing was imported: {exc}")
+        if errors:
+            print("Skipped rows (numbered from the first data row, not counting the header or blank lines):")
+        for number, error in errors:
+            print(f"Row {number}: {error}")
+        rate = len(item_ids) / seconds if seconds else 0
+        print(f"Imported {len(item_ids)} items in {seconds:.2f}s ({rate:.0f} items/s), {len(errors)} skipped.")
+    else:
+        main()
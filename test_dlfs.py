@@ -0,0 +1,678 @@
+import io
+import json
+import os
+import threading
+
+import pytest
+
+import dlfs
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return str(tmp_path / "data")
+
+
+def controller(data_dir, **kwargs):
+    return dlfs.DLFSController(storage=dlfs.JsonStorage(data_dir), **kwargs)
+
+
+def names(items):
+    return sorted(item["name"] for item in items)
+
+
+# === Legacy Data ===
+def test_duplicate_legacy_ids_are_renumbered(data_dir):
+    dlfs.init_data_dir(data_dir)
+    legacy = [
+        {"item_id": "ITEM-1234", "name": "iPhone", "description": "", "location": "Gym",
+         "item_type": "lost", "status": "reported"},
+        {"item_id": "ITEM-1234", "name": "Wallet", "description": "", "location": "Library",
+         "item_type": "found", "status": "reported"},
+    ]
+    with open(os.path.join(data_dir, "items.json"), "w") as file:
+        json.dump(legacy, file)
+    c = controller(data_dir)
+    assert names(c.search_items("iphone")) == ["iPhone"]
+    assert names(c.search_by_location("gym")) == ["iPhone"]
+    assert names(c.items_by_type("lost")) == ["iPhone"]
+    on_disk = dlfs.load_data("items.json", data_dir)
+    assert on_disk[0]["item_id"] == "ITEM-1234"
+    assert len({item["item_id"] for item in on_disk}) == 2
+
+
+# === Journal ===
+def test_journal_is_replayed_on_load(data_dir):
+    c = controller(data_dir, journaled=True)
+    item_id = c.report_item("Umbrella", "", "Gym", "found", 1)
+    c.approve_claim(c.claim_item(1, item_id))
+    assert dlfs.load_data("items.json", data_dir) == []
+    replayed = controller(data_dir, journaled=True)
+    assert replayed.get_item(item_id)["status"] == "claimed"
+    assert replayed.claims_by_status("approved")[0]["item_id"] == item_id
+
+
+def test_journal_is_compacted_into_snapshots(data_dir, monkeypatch):
+    monkeypatch.setattr(dlfs, "SNAPSHOT_INTERVAL", 3)
+    c = controller(data_dir, journaled=True)
+    for name in ["A", "B", "C"]:
+        c.report_item(name, "", "Gym", "lost", 1)
+    assert names(dlfs.load_data("items.json", data_dir)) == ["A", "B", "C"]
+    assert dlfs.read_journal(data_dir) == ([], 0)
+    c.report_item("D", "", "Gym", "lost", 1)
+    # A controller without journaling folds leftover entries into the snapshots
+    plain = controller(data_dir)
+    assert names(plain.items) == ["A", "B", "C", "D"]
+    assert dlfs.read_journal(data_dir) == ([], 0)
+    assert names(dlfs.load_data("items.json", data_dir)) == ["A", "B", "C", "D"]
+
+
+def test_app_controller_is_journaled(data_dir, monkeypatch):
+    monkeypatch.setattr(dlfs, "DATA_DIR", data_dir)
+    monkeypatch.setattr(dlfs, "_controller", None)
+    assert dlfs.get_controller().journaled
+    monkeypatch.setattr(dlfs, "_controller", None)
+    monkeypatch.setattr(dlfs, "JOURNALED", False)
+    assert not dlfs.get_controller().journaled
+
+
+# === Search ===
+def test_whole_word_search_uses_name_and_description(data_dir):
+    c = controller(data_dir)
+    c.report_item("Blue Umbrella", "folding, with strap", "Gym", "lost", 1)
+    c.report_item("Umbrella stand", "blue metal", "Library", "found", 1)
+    c.report_item("Bluetooth speaker", "", "Gym", "lost", 1)
+    assert names(c.search_items("umbrella blue", whole_words=True)) == ["Blue Umbrella", "Umbrella stand"]
+    assert names(c.search_items("strap", whole_words=True)) == ["Blue Umbrella"]
+    # Whole words only: "blue" is not a word of "Bluetooth"
+    assert "Bluetooth speaker" not in names(c.search_items("blue", whole_words=True))
+    assert c.search_items("umbrella piano", whole_words=True) == []
+
+
+def test_substring_search_keeps_trigram_index_current(data_dir):
+    c = controller(data_dir)
+    c.report_item("Black Backpack", "", "Gym", "lost", 1)
+    c.report_item("Water bottle", "", "Cafeteria", "found", 1)
+    assert names(c.search_items("PACK")) == ["Black Backpack"]
+    # Items reported after the index was built are found too
+    c.report_item("Laptop pack", "", "Library", "lost", 1)
+    assert names(c.search_items("pack")) == ["Black Backpack", "Laptop pack"]
+    # Queries shorter than a trigram fall back to a scan
+    assert names(c.search_items("wa")) == ["Water bottle"]
+    assert c.search_items("packs") == []
+
+
+def test_search_by_location_modes(data_dir):
+    c = controller(data_dir)
+    c.report_item("Scarf", "", "Library 2nd floor", "lost", 1)
+    c.report_item("Keys", "", "  library ", "found", 1)
+    c.report_item("Cap", "", "Gym", "lost", 1)
+    c = controller(data_dir)
+    c.report_item("Mug", "", "Libraries annex", "found", 1)
+    assert names(c.search_by_location("LIBRARY", match="exact")) == ["Keys"]
+    assert names(c.search_by_location("librar", match="prefix")) == ["Keys", "Mug", "Scarf"]
+    assert names(c.search_by_location("floor")) == ["Scarf"]
+    assert c.search_by_location("pool", match="prefix") == []
+    with pytest.raises(ValueError):
+        c.search_by_location("gym", match="fuzzy")
+
+
+def test_partitions_follow_status_changes(data_dir):
+    c = controller(data_dir)
+    lost = c.report_item("Scarf", "", "Library", "lost", 1)
+    found = c.report_item("Keys", "", "Gym", "found", 1)
+    first = c.claim_item(1, found)
+    second = c.claim_item(2, found)
+    assert names(c.items_by_type("lost")) == ["Scarf"]
+    assert names(c.items_by_status("reported")) == ["Keys", "Scarf"]
+    assert [claim["claim_id"] for claim in c.claims_by_status("pending")] == [first, second]
+    c.approve_claim(second)
+    assert names(c.items_by_status("claimed")) == ["Keys"]
+    assert names(c.items_by_status("reported")) == ["Scarf"]
+    assert [claim["claim_id"] for claim in c.claims_by_status("pending")] == [first]
+    assert [claim["claim_id"] for claim in c.claims_by_status("approved")] == [second]
+    assert c.items_by_type("unknown") == []
+    assert c.get_item(lost)["item_type"] == "lost"
+
+
+# === Claims ===
+def test_claim_for_unknown_item_is_rejected(data_dir):
+    c = controller(data_dir)
+    item_id = c.report_item("Keys", "", "Gym", "found", 1)
+    assert c.claim_item(1, "ITEM-missing") is None
+    assert c.claims == []
+    claim_id = c.claim_item(1, item_id)
+    assert claim_id.startswith("CLM-")
+    assert c.get_claim(claim_id)["item_id"] == item_id
+
+
+def test_approve_claims_skips_decided_and_repeated_ids(data_dir):
+    c = controller(data_dir)
+    item_ids, _ = c.bulk_report_items([{"name": "A", "location": "Gym", "item_type": "found"},
+                                       {"name": "B", "location": "Gym", "item_type": "found"}])
+    first, second = [c.claim_item(1, item_id) for item_id in item_ids]
+    c.approve_claim(first)
+    approved, errors = c.approve_claims([first, second, second, "CLM-missing"])
+    assert approved == [second]
+    assert errors == [(first, "already approved"), ("CLM-missing", "not found")]
+
+
+def test_approve_claims_needs_an_explicit_selection(data_dir):
+    c = controller(data_dir)
+    item_id = c.report_item("Keys", "", "Gym", "found", 1)
+    mine, theirs = c.claim_item(1, item_id), c.claim_item(2, item_id)
+    with pytest.raises(ValueError):
+        c.approve_claims()
+    with pytest.raises(ValueError):
+        c.approve_claims(usr_id=1)
+    with pytest.raises(ValueError):
+        c.approve_claims([mine], all_pending=True)
+    assert c.claims_by_status("approved") == []
+    assert c.approve_claims(user_id=2) == ([theirs], [])
+    assert c.approve_claims(all_pending=True) == ([mine], [])
+
+
+def test_fuzzy_search_ranks_by_edits(data_dir):
+    c = controller(data_dir)
+    for name in ["Unbrela", "Umbrella stand", "Blue Umbrela", "Umbrella", "Cat toy", "Cap"]:
+        c.report_item(name, "", "Gym", "lost", 1)
+    # Best matches first, ties in report order
+    assert [item["name"] for item in c.fuzzy_search_items("umbrella")] == [
+        "Umbrella stand", "Umbrella", "Blue Umbrela", "Unbrela"]
+    assert [item["name"] for item in c.fuzzy_search_items("umbrella", limit=3)] == [
+        "Umbrella stand", "Umbrella", "Blue Umbrela"]
+    # Every word must match; a swap of adjacent letters is one edit
+    assert names(c.fuzzy_search_items("bleu umbrella")) == ["Blue Umbrela"]
+    assert names(c.fuzzy_search_items("umbrella", max_distance=1)) == ["Blue Umbrela", "Umbrella", "Umbrella stand"]
+    # Short words allow fewer edits
+    assert names(c.fuzzy_search_items("cap")) == ["Cap", "Cat toy"]
+    assert c.fuzzy_search_items("ca") == []
+    # Items reported after the index was built are found too
+    c.report_item("Umbrela case", "", "Gym", "lost", 1)
+    assert names(c.fuzzy_search_items("umbrella case")) == ["Umbrela case"]
+    assert c.fuzzy_search_items("") == []
+
+
+# === SQLite Storage ===
+def test_sqlite_storage_has_no_journal(tmp_path):
+    with pytest.raises(ValueError):
+        dlfs.DLFSController(journaled=True, storage=dlfs.SQLiteStorage(str(tmp_path / "dlfs.db")))
+
+
+def test_sqlite_reloads_only_changed_tables(tmp_path):
+    path = str(tmp_path / "dlfs.db")
+    a = dlfs.DLFSController(storage=dlfs.SQLiteStorage(path))
+    b = dlfs.DLFSController(storage=dlfs.SQLiteStorage(path))
+    item_id = a.report_item("Scarf", "", "Library", "lost", 1)
+    # A controller's own writes do not make its tables stale
+    assert not a.storage.is_stale("items.json")
+    assert b.storage.is_stale("items.json")
+    assert not b.storage.is_stale("users.json")
+    assert not b.storage.is_stale("claims.json")
+    assert b.refresh()
+    assert b.get_item(item_id)["name"] == "Scarf"
+    assert not b.refresh()
+
+
+def test_sqlite_controllers_never_share_a_user_id(tmp_path):
+    path = str(tmp_path / "dlfs.db")
+    a = dlfs.DLFSController(storage=dlfs.SQLiteStorage(path))
+    b = dlfs.DLFSController(storage=dlfs.SQLiteStorage(path))
+    user_ids = []
+    thread = threading.Thread(target=lambda: user_ids.append(b.add_user("Ben", "ben@x", "pw")))
+    with a.storage.lock():
+        thread.start()
+        # The database lock keeps the other connection out until it is released
+        thread.join(0.2)
+        assert thread.is_alive()
+        user_ids.append(a.add_user("Ann", "ann@x", "pw"))
+    thread.join()
+    assert len(set(user_ids)) == 2
+    fresh = dlfs.DLFSController(storage=dlfs.SQLiteStorage(path))
+    assert fresh.login("ann@x", "pw")["id"] == user_ids[0]
+    assert fresh.login("ben@x", "pw")["id"] == user_ids[1]
+
+
+def test_app_controller_uses_sqlite_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "dlfs.db")
+    monkeypatch.setattr(dlfs, "SQLITE_PATH", path)
+    monkeypatch.setattr(dlfs, "_controller", None)
+    c = dlfs.get_controller()
+    assert isinstance(c.storage, dlfs.SQLiteStorage)
+    assert not c.journaled
+    item_id = c.report_item("Scarf", "", "Library", "lost", 1)
+    assert dlfs.DLFSController(storage=dlfs.SQLiteStorage(path)).get_item(item_id)
+
+
+# === Streaming ===
+@pytest.fixture
+def streamed(monkeypatch):
+    # Stream every file in chunks much smaller than a record
+    monkeypatch.setattr(dlfs, "STREAM_THRESHOLD", 0)
+    monkeypatch.setattr(dlfs, "STREAM_CHUNK_SIZE", 7)
+
+
+def test_streamed_records_match_the_file(data_dir, streamed):
+    dlfs.init_data_dir(data_dir)
+    records = [{"item_id": f"ITEM-{n}", "name": "Café \"mug\" \U0001F600", "description": "a\\nb " * n,
+                "score": -1.5e-3 * n, "found": n % 2 == 0, "owner": None} for n in range(50)]
+    dlfs.save_data("items.json", records, data_dir)
+    assert list(dlfs.iter_data("items.json", data_dir)) == records
+
+
+def test_streaming_stops_at_damage(data_dir, streamed, monkeypatch):
+    dlfs.init_data_dir(data_dir)
+    path = os.path.join(data_dir, "items.json")
+    with open(path, "w") as file:
+        file.write('[{"name": "Scarf"}, {"name": ?}, ' + ", ".join(['{"name": "Keys"}'] * 1000) + "]")
+    reads = []
+
+    class CountingFile:
+        def __init__(self, file):
+            self.file = file
+
+        def read(self, size):
+            reads.append(size)
+            return self.file.read(size)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.file.close()
+
+    monkeypatch.setattr(dlfs, "open", lambda *args: CountingFile(open(*args)), raising=False)
+    with pytest.raises(json.JSONDecodeError):
+        list(dlfs.iter_data("items.json", data_dir))
+    # The damage is reported without reading the rest of the file
+    assert sum(reads) < 100
+
+
+# === JSON Lines ===
+def test_convert_to_jsonl_and_back(data_dir):
+    c = controller(data_dir)
+    for name in ["Scarf", "Keys", "Mug"]:
+        c.report_item(name, "", "Gym", "lost", 1)
+    path = os.path.join(data_dir, "items.json")
+    assert dlfs.detect_format(path) == "json"
+    dlfs.convert_data_dir("jsonl", data_dir)
+    assert dlfs.detect_format(path) == "jsonl"
+    c = controller(data_dir)
+    size = os.path.getsize(path)
+    c.report_item("Cap", "", "Gym", "lost", 1)
+    # A new record is appended as one line instead of rewriting the file
+    with open(path) as file:
+        file.seek(size)
+        assert json.loads(file.read())["name"] == "Cap"
+    dlfs.convert_data_dir("json", data_dir)
+    assert dlfs.detect_format(path) == "json"
+    assert names(controller(data_dir).items) == ["Cap", "Keys", "Mug", "Scarf"]
+    with pytest.raises(ValueError):
+        dlfs.convert_data_dir("xml", data_dir)
+
+
+def test_jsonl_ranges_cover_every_record(data_dir):
+    dlfs.init_data_dir(data_dir)
+    records = [{"n": n, "text": "x" * (n % 7)} for n in range(100)]
+    dlfs.save_data("items.json", records, data_dir, fmt="jsonl")
+    ranges = dlfs.split_jsonl("items.json", 4, data_dir)
+    assert len(ranges) == 4
+    read = [record for start, end in ranges for record in dlfs.iter_jsonl_range("items.json", start, end, data_dir)]
+    assert read == records
+
+
+def test_convert_waits_for_the_directory_lock(data_dir):
+    controller(data_dir).report_item("Scarf", "", "Gym", "lost", 1)
+    thread = threading.Thread(target=dlfs.convert_data_dir, args=("jsonl", data_dir))
+    with dlfs.JsonStorage(data_dir).lock():
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+        assert dlfs.detect_format(os.path.join(data_dir, "items.json")) == "json"
+    thread.join()
+    assert dlfs.detect_format(os.path.join(data_dir, "items.json")) == "jsonl"
+
+
+def test_migration_copies_journaled_changes(data_dir, tmp_path):
+    c = controller(data_dir, journaled=True)
+    item_id = c.report_item("Scarf", "", "Gym", "lost", 1)
+    path = str(tmp_path / "dlfs.db")
+    dlfs.migrate_json_to_sqlite(path, data_dir).close()
+    assert dlfs.DLFSController(storage=dlfs.SQLiteStorage(path)).get_item(item_id)["name"] == "Scarf"
+
+
+# === Columnar Filters ===
+@pytest.mark.parametrize("vectorised", [True, False])
+def test_filter_and_count_items(data_dir, monkeypatch, vectorised):
+    if vectorised:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(dlfs, "_numpy", False)
+    c = controller(data_dir)
+    keys = c.report_item("Keys", "", "Gym", "found", 1)
+    c.report_item("Scarf", "", "Library", "lost", 1)
+    c.report_item("Cap", "", "gym ", "lost", 1)
+    assert names(c.filter_items(location="GYM")) == ["Cap", "Keys"]
+    assert names(c.filter_items(item_type="lost", status=["reported", "claimed"])) == ["Cap", "Scarf"]
+    assert c.count_items() == 3
+    assert c.count_items(item_type="lost", location="gym") == 1
+    # The columns follow changes made after they were built
+    c.approve_claim(c.claim_item(2, keys))
+    c.report_item("Mug", "", "Gym", "found", 1)
+    assert names(c.filter_items(status="claimed")) == ["Keys"]
+    assert c.count_items(location="gym", status="reported") == 2
+    assert c.filter_items(item_type="unknown") == []
+
+
+# === Crash Recovery ===
+def test_truncated_file_is_restored_from_snapshot(data_dir, capsys):
+    c = controller(data_dir)
+    c.report_item("Keys", "", "Gym", "lost", 1)
+    c.report_item("Scarf", "", "Gym", "lost", 1)
+    path = os.path.join(data_dir, "items.json")
+    with open(path, "r+") as file:
+        file.truncate(os.path.getsize(path) // 2)
+    assert names(controller(data_dir).items) == ["Keys"]
+    assert "restored" in capsys.readouterr().err
+
+
+def test_damaged_file_without_snapshot_raises(data_dir):
+    dlfs.init_data_dir(data_dir)
+    with open(os.path.join(data_dir, "items.json"), "w") as file:
+        file.write('[{"item_id": ')
+    with pytest.raises(json.JSONDecodeError):
+        controller(data_dir)
+
+
+def test_torn_jsonl_append_is_dropped(data_dir):
+    c = controller(data_dir)
+    c.report_item("Keys", "", "Gym", "lost", 1)
+    dlfs.convert_data_dir("jsonl", data_dir)
+    with open(os.path.join(data_dir, "items.json"), "a") as file:
+        file.write('{"item_id": "ITEM-')
+    assert names(controller(data_dir).items) == ["Keys"]
+
+
+# === Multi-process Access ===
+def test_two_controllers_merge_their_changes(data_dir):
+    a = controller(data_dir)
+    b = controller(data_dir)
+    wallet = a.report_item("Wallet", "", "Gym", "lost", 1)
+    b.report_item("Phone", "", "Library", "found", 1)
+    claim_id = a.claim_item(1, wallet)
+    b.refresh()
+    assert b.approve_claim(claim_id)
+    a.refresh()
+    assert names(a.items) == names(b.items) == ["Phone", "Wallet"]
+    assert a.get_item(wallet)["status"] == "claimed"
+    assert names(controller(data_dir).items) == ["Phone", "Wallet"]
+
+
+@pytest.mark.parametrize("journaled", [False, True])
+def test_refresh_reads_only_appended_records(data_dir, monkeypatch, journaled):
+    controller(data_dir).report_item("Keys", "", "Gym", "lost", 1)
+    dlfs.convert_data_dir("jsonl", data_dir)
+    a = controller(data_dir, journaled=journaled)
+    b = controller(data_dir, journaled=journaled)
+    keys = b.items[0]
+    assert names(b.search_items("cap")) == []
+    a.report_item("Cap", "", "Library", "lost", 1)
+    a.report_item("Scarf", "", "Gym", "found", 1)
+
+    def load(file_name, record_type=None):
+        raise AssertionError(f"{file_name} was loaded in full")
+
+    monkeypatch.setattr(b.storage, "load", load)
+    assert b.refresh()
+    assert b.items[0] is keys
+    assert names(b.items) == ["Cap", "Keys", "Scarf"]
+    assert names(b.search_items("cap")) == ["Cap"]
+    assert names(b.search_by_location("gym", match="exact")) == ["Keys", "Scarf"]
+    assert not b.refresh()
+
+
+# === Async Controller ===
+def test_async_mutations_are_coalesced_into_one_flush(data_dir, monkeypatch):
+    import asyncio
+
+    async def run():
+        async with dlfs.AsyncDLFSController(controller(data_dir)) as app:
+            writes = []
+            apply = app.controller.storage.apply
+            monkeypatch.setattr(app.controller.storage, "apply",
+                                lambda file_name, *args: writes.append(file_name) or apply(file_name, *args))
+            item_ids = await asyncio.gather(*(app.report_item(f"Item {n}", "", "Gym", "lost", 1) for n in range(10)))
+            # Visible right away, before anything was written
+            assert (await app.get_item(item_ids[0]))["name"] == "Item 0"
+            await app.flush()
+            assert writes == ["items.json"]
+            assert len(controller(data_dir).items) == 10
+            claim_id = await app.claim_item(1, item_ids[3])
+        # Leaving the block persists outstanding changes
+        assert controller(data_dir).get_claim(claim_id)["item_id"] == item_ids[3]
+        assert app.controller.autoflush
+
+    asyncio.run(run())
+
+
+# === Group Commit ===
+def test_group_commit_appends_before_returning(data_dir, monkeypatch):
+    syncs = []
+    monkeypatch.setattr(dlfs, "sync_journal", lambda data_dir=None: syncs.append(data_dir))
+    c = controller(data_dir)
+    writer = c.start_group_commit(max_latency=60)
+    try:
+        item_id = c.report_item("Laptop", "", "Gym", "lost", 1)
+        # Already in the journal, before the writer synced anything
+        assert not c.has_pending()
+        assert syncs == []
+        assert controller(data_dir, journaled=True).get_item(item_id)["name"] == "Laptop"
+        writer.flush()
+        assert syncs == [data_dir]
+    finally:
+        c.stop_group_commit()
+    assert dlfs.read_journal(data_dir) == ([], 0)
+    assert names(dlfs.load_data("items.json", data_dir)) == ["Laptop"]
+
+
+def test_group_commit_counts_records(data_dir, monkeypatch):
+    synced = threading.Event()
+    monkeypatch.setattr(dlfs, "sync_journal", lambda data_dir=None: synced.set())
+    c = controller(data_dir)
+    c.start_group_commit(max_latency=60, max_records=5)
+    try:
+        rows = [{"name": f"Item {n}", "location": "Gym", "item_type": "lost"} for n in range(5)]
+        c.bulk_report_items(rows)
+        # One call with max_records records starts a group without waiting for max_latency
+        assert synced.wait(5)
+    finally:
+        c.stop_group_commit()
+
+
+def test_group_commit_compacts_the_journal(data_dir, monkeypatch):
+    monkeypatch.setattr(dlfs, "SNAPSHOT_INTERVAL", 3)
+    c = controller(data_dir)
+    writer = c.start_group_commit(max_latency=60)
+    try:
+        for name in ["A", "B", "C"]:
+            c.report_item(name, "", "Gym", "lost", 1)
+        writer.flush()
+        assert dlfs.read_journal(data_dir) == ([], 0)
+        assert names(dlfs.load_data("items.json", data_dir)) == ["A", "B", "C"]
+        item_id = c.report_item("D", "", "Gym", "found", 1)
+    finally:
+        c.stop_group_commit()
+    # Changes after the writer stopped are not overridden by older journal entries
+    c.approve_claim(c.claim_item(1, item_id))
+    assert controller(data_dir).get_item(item_id)["status"] == "claimed"
+
+
+def test_group_commit_reports_failed_writes_and_retries(data_dir, monkeypatch):
+    c = controller(data_dir)
+    writer = c.start_group_commit(max_latency=0.01)
+    append_journal, sync_journal = dlfs.append_journal, dlfs.sync_journal
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    try:
+        # A change that could not be appended is not acknowledged, and stays pending
+        monkeypatch.setattr(dlfs, "append_journal", fail)
+        with pytest.raises(OSError):
+            c.report_item("Laptop", "", "Gym", "lost", 1)
+        assert c.has_pending()
+        monkeypatch.setattr(dlfs, "append_journal", append_journal)
+        # A group whose sync failed is reported at the next barrier
+        monkeypatch.setattr(dlfs, "sync_journal", fail)
+        with pytest.raises(OSError):
+            writer.flush()
+        assert not c.has_pending()
+        monkeypatch.setattr(dlfs, "sync_journal", sync_journal)
+        writer.flush()
+    finally:
+        c.stop_group_commit()
+    assert names(dlfs.load_data("items.json", data_dir)) == ["Laptop"]
+
+
+def test_two_controllers_never_share_a_user_id(data_dir):
+    a = controller(data_dir)
+    b = controller(data_dir)
+    a.start_group_commit(max_latency=1)
+    b.autoflush = False
+    try:
+        ann = a.add_user("Ann", "ann@x", "pw")
+        ben = b.add_user("Ben", "ben@x", "pw")
+    finally:
+        a.stop_group_commit()
+    assert ann != ben
+    fresh = controller(data_dir)
+    assert fresh.login("ann@x", "pw")["id"] == ann
+    assert fresh.login("ben@x", "pw")["id"] == ben
+
+
+def test_group_commit_needs_a_journal(tmp_path):
+    c = dlfs.DLFSController(storage=dlfs.SQLiteStorage(str(tmp_path / "dlfs.db")))
+    with pytest.raises(ValueError):
+        c.start_group_commit()
+
+
+# === Bulk Operations ===
+def test_import_reports_bad_lines_by_row(data_dir, tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"name": "A", "location": "Gym", "item_type": "lost"}\n'
+                    '{"name": oops\n'
+                    '{"name": "B", "location": "Gym", "item_type": "found"}\n')
+    c = controller(data_dir)
+    item_ids, errors, _ = dlfs.import_items_file(str(path), c)
+    assert len(item_ids) == 2
+    assert [number for number, _ in errors] == [2]
+
+
+def test_failed_read_imports_nothing(data_dir):
+    def rows():
+        yield {"name": "A", "location": "Gym", "item_type": "lost"}
+        raise OSError("read error")
+
+    c = controller(data_dir)
+    with pytest.raises(OSError):
+        c.bulk_report_items(rows())
+    assert c.items == [] and not c.has_pending()
+
+
+def test_import_reads_csv_with_byte_order_mark(data_dir, tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_text("name,description,location,item_type\nScarf,,Gym,lost\n,,Gym,lost\n", encoding="utf-8-sig")
+    c = controller(data_dir)
+    item_ids, errors, _ = dlfs.import_items_file(str(path), c)
+    assert c.get_item(item_ids[0])["name"] == "Scarf"
+    # Rows are numbered from the first data row
+    assert [number for number, _ in errors] == [2]
+
+
+def test_async_bulk_report_items(data_dir):
+    import asyncio
+
+    async def run():
+        async with dlfs.AsyncDLFSController(controller(data_dir)) as app:
+            rows = [{"name": name, "location": "Gym", "item_type": "lost"} for name in ["A", "B"]]
+            item_ids, errors = await app.bulk_report_items(rows)
+            assert len(item_ids) == 2 and errors == []
+            await app.flush()
+            assert names(controller(data_dir).items) == ["A", "B"]
+
+    asyncio.run(run())
+
+
+# === Listing ===
+def pages(c, limit, order):
+    items, cursor = c.list_items(limit=limit, order=order)
+    while cursor is not None:
+        page, cursor = c.list_items(cursor, limit, order)
+        items.extend(page)
+    return items
+
+
+@pytest.mark.parametrize("order", ["reported", "item_id"])
+def test_list_items_pages_through_every_item(data_dir, order):
+    dlfs.init_data_dir(data_dir)
+    legacy = [{"item_id": item_id, "name": item_id, "description": "", "location": "Gym",
+               "item_type": "lost", "status": "reported"} for item_id in ["ITEM-9999", "ITEM-1234"]]
+    dlfs.save_data("items.json", legacy, data_dir)
+    c = controller(data_dir)
+    for n in range(5):
+        c.report_item(f"Item {n}", "", "Gym", "lost", 1)
+    expected = c.items if order == "reported" else sorted(c.items, key=lambda item: item["item_id"])
+    assert pages(c, 3, order) == expected
+    assert pages(c, 7, order) == expected
+    first, cursor = c.list_items(limit=3, order=order)
+    # Items reported meanwhile do not shift the next page
+    c.report_item("Late", "", "Gym", "lost", 1)
+    second, _ = c.list_items(cursor, 3, order)
+    assert first + second == expected[:6]
+
+
+def test_list_items_rejects_bad_arguments(data_dir):
+    c = controller(data_dir)
+    assert c.list_items() == ([], None)
+    with pytest.raises(ValueError):
+        c.list_items("ITEM-missing")
+    with pytest.raises(ValueError):
+        c.list_items(limit=0)
+    with pytest.raises(ValueError):
+        c.list_items(order="name")
+
+
+# === Output ===
+class CountingOutput(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+COLUMNS = (("item_id", "Item ID"), ("name", "Name"))
+ROWS = [{"item_id": "ITEM-1", "name": "Scarf"}, {"item_id": "ITEM-22", "name": "Very long umbrella"}]
+
+
+def test_render_rows_writes_once():
+    out = CountingOutput()
+    dlfs.render_rows(ROWS, COLUMNS, out=out)
+    assert out.getvalue() == "Item ID: ITEM-1, Name: Scarf\nItem ID: ITEM-22, Name: Very long umbrella\n"
+    assert out.writes == 1
+
+
+def test_render_rows_aligns_and_truncates():
+    out = io.StringIO()
+    dlfs.render_rows(ROWS, COLUMNS, align=True, max_width=10, out=out)
+    assert out.getvalue().splitlines() == [
+        "Item ID  Name",
+        "-------  ----------",
+        "ITEM-1   Scarf",
+        "ITEM-22  Very lo...",
+    ]
+    out = io.StringIO()
+    dlfs.render_rows([], COLUMNS, out=out)
+    assert out.getvalue() == ""